@@ -0,0 +1,37 @@
+"""Add shared_messages
+
+Revision ID: 3f6a8c1d5e29
+Revises: b9d14f6e2a07
+Create Date: 2026-10-17 20:31:55.046817
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '3f6a8c1d5e29'
+down_revision: Union[str, None] = 'b9d14f6e2a07'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        'shared_messages',
+        sa.Column('wish_id', sa.Integer(), nullable=False),
+        sa.Column('owner_id', sa.Integer(), nullable=False),
+        sa.Column('message_id', sa.Integer(), nullable=False),
+        sa.Column('wish_updated_at', sa.DateTime(), nullable=True),
+        sa.PrimaryKeyConstraint('wish_id'),
+    )
+    op.create_index(
+        'idx_shared_messages_owner', 'shared_messages', ['owner_id'], unique=False
+    )
+
+
+def downgrade() -> None:
+    op.drop_index('idx_shared_messages_owner', table_name='shared_messages')
+    op.drop_table('shared_messages')
@@ -0,0 +1,36 @@
+"""Add cache_invalidations
+
+Revision ID: 5d8e2b41f0c7
+Revises: a3f1c9d27e54
+Create Date: 2026-10-17 14:26:08.117402
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '5d8e2b41f0c7'
+down_revision: Union[str, None] = 'a3f1c9d27e54'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        'cache_invalidations',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('user_id', sa.Integer(), nullable=False),
+        sa.Column('created_at', sa.DateTime(), nullable=False),
+        sa.PrimaryKeyConstraint('id'),
+    )
+    op.create_index(
+        'idx_cache_invalidations_created', 'cache_invalidations', ['created_at'], unique=False
+    )
+
+
+def downgrade() -> None:
+    op.drop_index('idx_cache_invalidations_created', table_name='cache_invalidations')
+    op.drop_table('cache_invalidations')
@@ -0,0 +1,62 @@
+"""Add share_code to users
+
+Revision ID: 7a2c5e9f4b83
+Revises: e4b7d20a9c16
+Create Date: 2026-10-17 19:05:31.184472
+
+"""
+import hashlib
+import secrets
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '7a2c5e9f4b83'
+down_revision: Union[str, None] = 'e4b7d20a9c16'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column('users', sa.Column('share_code', sa.String(length=16), nullable=True))
+    op.add_column('users', sa.Column('share_code_changed_at', sa.DateTime(), nullable=True))
+
+    # Backfill the codes that used to be computed from the user id, so
+    # links already sent keep working. 8 hex digits of MD5 can collide:
+    # the oldest user keeps such a code, the others get a random one
+    users = sa.table(
+        'users', sa.column('user_id', sa.Integer), sa.column('share_code', sa.String)
+    )
+    connection = op.get_bind()
+    user_ids = connection.execute(
+        sa.select(users.c.user_id).order_by(users.c.user_id)
+    ).scalars()
+    taken = set()
+    rows = []
+    for user_id in user_ids:
+        share_code = hashlib.md5(str(user_id).encode()).hexdigest()[:8]
+        if share_code in taken:
+            share_code = secrets.token_urlsafe(9)
+        taken.add(share_code)
+        rows.append({'uid': user_id, 'code': share_code})
+    if rows:
+        connection.execute(
+            users.update()
+            .where(users.c.user_id == sa.bindparam('uid'))
+            .values(share_code=sa.bindparam('code')),
+            rows,
+        )
+
+    op.create_index('idx_users_share_code', 'users', ['share_code'], unique=True)
+    op.create_index('idx_users_share_code_changed', 'users', ['share_code_changed_at'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index('idx_users_share_code_changed', table_name='users')
+    op.drop_index('idx_users_share_code', table_name='users')
+    with op.batch_alter_table('users') as batch_op:
+        batch_op.drop_column('share_code_changed_at')
+        batch_op.drop_column('share_code')
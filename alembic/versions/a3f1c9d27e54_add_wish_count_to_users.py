@@ -0,0 +1,35 @@
+"""Add wish_count to users
+
+Revision ID: a3f1c9d27e54
+Revises: 46bcf48b0e6d
+Create Date: 2026-10-17 10:12:31.504118
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'a3f1c9d27e54'
+down_revision: Union[str, None] = '46bcf48b0e6d'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column(
+        'users',
+        sa.Column('wish_count', sa.Integer(), nullable=False, server_default='0'),
+    )
+    # Backfill the counter from the existing wishes
+    op.execute(
+        "UPDATE users SET wish_count = "
+        "(SELECT COUNT(*) FROM wishes WHERE wishes.user_id = users.user_id)"
+    )
+
+
+def downgrade() -> None:
+    with op.batch_alter_table('users') as batch_op:
+        batch_op.drop_column('wish_count')
@@ -0,0 +1,36 @@
+"""Add share_views to users and view_count to wishes
+
+Revision ID: b9d14f6e2a07
+Revises: 7a2c5e9f4b83
+Create Date: 2026-10-17 19:48:12.730519
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'b9d14f6e2a07'
+down_revision: Union[str, None] = '7a2c5e9f4b83'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column(
+        'users',
+        sa.Column('share_views', sa.Integer(), nullable=False, server_default='0'),
+    )
+    op.add_column(
+        'wishes',
+        sa.Column('view_count', sa.Integer(), nullable=False, server_default='0'),
+    )
+
+
+def downgrade() -> None:
+    with op.batch_alter_table('wishes') as batch_op:
+        batch_op.drop_column('view_count')
+    with op.batch_alter_table('users') as batch_op:
+        batch_op.drop_column('share_views')
@@ -0,0 +1,38 @@
+"""Add telegram_files
+
+Revision ID: c71e4a9b3d25
+Revises: 5d8e2b41f0c7
+Create Date: 2026-10-17 16:02:44.390215
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c71e4a9b3d25'
+down_revision: Union[str, None] = '5d8e2b41f0c7'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        'telegram_files',
+        sa.Column('file_unique_id', sa.String(length=64), nullable=False),
+        sa.Column('file_id', sa.String(length=255), nullable=False),
+        sa.Column('file_path', sa.String(length=255), nullable=True),
+        sa.Column('file_size', sa.Integer(), nullable=True),
+        sa.Column('fetched_at', sa.DateTime(), nullable=False),
+        sa.PrimaryKeyConstraint('file_unique_id'),
+    )
+    op.create_index(
+        'idx_telegram_files_file_id', 'telegram_files', ['file_id'], unique=False
+    )
+
+
+def downgrade() -> None:
+    op.drop_index('idx_telegram_files_file_id', table_name='telegram_files')
+    op.drop_table('telegram_files')
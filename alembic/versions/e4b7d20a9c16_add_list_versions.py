@@ -0,0 +1,37 @@
+"""Add list_version to users and cache_invalidations
+
+Revision ID: e4b7d20a9c16
+Revises: c71e4a9b3d25
+Create Date: 2026-10-17 18:21:07.552903
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e4b7d20a9c16'
+down_revision: Union[str, None] = 'c71e4a9b3d25'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column(
+        'users',
+        sa.Column('list_version', sa.Integer(), nullable=False, server_default='0'),
+    )
+    # Rows logged before the upgrade have no version
+    op.add_column(
+        'cache_invalidations',
+        sa.Column('list_version', sa.Integer(), nullable=True),
+    )
+
+
+def downgrade() -> None:
+    with op.batch_alter_table('cache_invalidations') as batch_op:
+        batch_op.drop_column('list_version')
+    with op.batch_alter_table('users') as batch_op:
+        batch_op.drop_column('list_version')
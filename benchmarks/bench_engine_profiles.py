@@ -0,0 +1,135 @@
+"""
+Write throughput of the database engine profiles.
+
+Every write is its own transaction, like a wish added from a handler, and
+several writers run concurrently. The readonly profile cannot write, so
+reads/sec are reported for it instead.
+
+Usage:
+    python benchmarks/bench_engine_profiles.py [--writes 2000] [--concurrency 50]
+"""
+import argparse
+import asyncio
+import os
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+os.environ.setdefault("BOT_TOKEN", "benchmark")  # config.py requires one
+
+from sqlalchemy import select  # noqa: E402
+from sqlalchemy.exc import OperationalError  # noqa: E402
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine  # noqa: E402
+
+from database import ENGINE_PROFILES, create_db_engine, get_async_url  # noqa: E402
+from models import Base, User, Wish  # noqa: E402
+
+USER_ID = 1
+
+
+async def prepare(db_engine):
+    """Create the schema and the user owning all benchmark wishes"""
+    async with db_engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+    Session = async_sessionmaker(bind=db_engine, expire_on_commit=False)
+    async with Session() as db, db.begin():
+        db.add(User(user_id=USER_ID, first_name="Benchmark"))
+    return Session
+
+
+async def run_writes(Session, writes: int, concurrency: int) -> tuple[float, int]:
+    """Returns (writes per second, failed writes)"""
+    queue = asyncio.Queue()
+    for i in range(writes):
+        queue.put_nowait(i)
+    failed = 0
+
+    async def writer():
+        nonlocal failed
+        while not queue.empty():
+            i = queue.get_nowait()
+            try:
+                async with Session() as db, db.begin():
+                    db.add(Wish(user_id=USER_ID, title=f"Wish {i}", price="100 UAH"))
+            except OperationalError:  # "database is locked"
+                failed += 1
+
+    started = time.perf_counter()
+    await asyncio.gather(*(writer() for _ in range(concurrency)))
+    elapsed = time.perf_counter() - started
+    return (writes - failed) / elapsed, failed
+
+
+async def run_reads(Session, reads: int, concurrency: int) -> float:
+    """Returns wishlist reads per second"""
+    queue = asyncio.Queue()
+    for i in range(reads):
+        queue.put_nowait(i)
+
+    async def reader():
+        while not queue.empty():
+            queue.get_nowait()
+            async with Session() as db:
+                await db.execute(
+                    select(Wish.wish_id, Wish.title)
+                    .where(Wish.user_id == USER_ID)
+                    .order_by(Wish.created_at.desc())
+                    .limit(20)
+                )
+
+    started = time.perf_counter()
+    await asyncio.gather(*(reader() for _ in range(concurrency)))
+    return reads / (time.perf_counter() - started)
+
+
+async def bench_baseline(directory: str, writes: int, concurrency: int):
+    """The engine as it was created before profiles existed"""
+    url = f"sqlite:///{directory}/baseline.db"
+    db_engine = create_async_engine(get_async_url(url))
+    Session = await prepare(db_engine)
+    rate, failed = await run_writes(Session, writes, concurrency)
+    await db_engine.dispose()
+    print(f"{'baseline':<10} {rate:>10.0f} writes/s   failed: {failed}")
+
+
+async def bench_profile(directory: str, profile: str, writes: int, concurrency: int):
+    url = f"sqlite:///{directory}/{profile}.db"
+
+    if profile == "readonly":
+        # Fill the file with a writable engine, then read it back read-only
+        writer_engine = create_db_engine(url, "fast")
+        Session = await prepare(writer_engine)
+        await run_writes(Session, writes, concurrency)
+        await writer_engine.dispose()
+
+        db_engine = create_db_engine(url, profile)
+        Session = async_sessionmaker(bind=db_engine)
+        rate = await run_reads(Session, writes, concurrency)
+        await db_engine.dispose()
+        print(f"{profile:<10} {rate:>10.0f} reads/s    (writes are rejected)")
+        return
+
+    db_engine = create_db_engine(url, profile)
+    Session = await prepare(db_engine)
+    rate, failed = await run_writes(Session, writes, concurrency)
+    await db_engine.dispose()
+    print(f"{profile:<10} {rate:>10.0f} writes/s   failed: {failed}")
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--writes", type=int, default=2000)
+    parser.add_argument("--concurrency", type=int, default=50)
+    args = parser.parse_args()
+
+    print(f"{args.writes} single-row transactions, {args.concurrency} concurrent writers\n")
+    with tempfile.TemporaryDirectory() as directory:
+        await bench_baseline(directory, args.writes, args.concurrency)
+        for profile in ENGINE_PROFILES:
+            await bench_profile(directory, profile, args.writes, args.concurrency)
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
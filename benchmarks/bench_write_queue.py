@@ -0,0 +1,106 @@
+"""
+Sustained write throughput: one transaction per write vs the write queue.
+
+Both runs issue the same concurrent add_wish-style inserts against the
+same engine profile; the queued run batches them with group commit.
+
+Usage:
+    python benchmarks/bench_write_queue.py [--writes 5000] [--concurrency 100] [--profile durable]
+"""
+import argparse
+import asyncio
+import os
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+os.environ.setdefault("BOT_TOKEN", "benchmark")  # config.py requires one
+
+from sqlalchemy.exc import OperationalError  # noqa: E402
+from sqlalchemy.ext.asyncio import async_sessionmaker  # noqa: E402
+
+from database import create_db_engine  # noqa: E402
+from models import Base, User, Wish  # noqa: E402
+from write_queue import WriteQueue  # noqa: E402
+
+USER_ID = 1
+
+
+async def prepare(url: str, profile: str):
+    db_engine = create_db_engine(url, profile)
+    async with db_engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+    Session = async_sessionmaker(bind=db_engine, expire_on_commit=False)
+    async with Session() as db, db.begin():
+        db.add(User(user_id=USER_ID, first_name="Benchmark"))
+    return db_engine, Session
+
+
+def insert_op(i: int):
+    async def op(db):
+        db.add(Wish(user_id=USER_ID, title=f"Wish {i}", price="100 UAH"))
+        await db.flush()
+    return op
+
+
+async def run(write, writes: int, concurrency: int) -> tuple[float, int]:
+    """Returns (writes per second, failed writes)"""
+    queue = asyncio.Queue()
+    for i in range(writes):
+        queue.put_nowait(i)
+    failed = 0
+
+    async def worker():
+        nonlocal failed
+        while not queue.empty():
+            i = queue.get_nowait()
+            try:
+                await write(i)
+            except OperationalError:  # "database is locked"
+                failed += 1
+
+    started = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    elapsed = time.perf_counter() - started
+    return (writes - failed) / elapsed, failed
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--writes", type=int, default=5000)
+    parser.add_argument("--concurrency", type=int, default=100)
+    parser.add_argument("--profile", default="durable")
+    args = parser.parse_args()
+
+    print(
+        f"{args.writes} writes, {args.concurrency} concurrent callers, "
+        f"profile '{args.profile}'\n"
+    )
+    with tempfile.TemporaryDirectory() as directory:
+        db_engine, Session = await prepare(f"sqlite:///{directory}/direct.db", args.profile)
+
+        async def direct(i):
+            async with Session() as db, db.begin():
+                await insert_op(i)(db)
+
+        rate, failed = await run(direct, args.writes, args.concurrency)
+        await db_engine.dispose()
+        print(f"{'direct':<8} {rate:>10.0f} writes/s   failed: {failed}")
+
+        db_engine, _ = await prepare(f"sqlite:///{directory}/queued.db", args.profile)
+        writer = WriteQueue(db_engine)
+        await writer.start()
+
+        async def queued(i):
+            await writer.submit(insert_op(i))
+
+        rate, failed = await run(queued, args.writes, args.concurrency)
+        await writer.stop()
+        await db_engine.dispose()
+        print(f"{'queued':<8} {rate:>10.0f} writes/s   failed: {failed}")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
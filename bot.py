@@ -1,3 +1,4 @@
+import asyncio
 import os
 import logging
 
@@ -8,11 +9,20 @@ from telegram.ext import (
     MessageHandler,
     CallbackQueryHandler,
     ConversationHandler,
+    InlineQueryHandler,
     filters,
     ContextTypes,
+    ExtBot,
+)
+from telegram.request import HTTPXRequest
+from config import BOT_TOKEN, CONCURRENT_UPDATES, CACHE_STATS_INTERVAL, CACHE_WARMUP_USERS
+from database import (
+    init_db,
+    close_db,
+    unit_of_work,
+    current_unit_of_work,
+    release_connection,
 )
-from config import BOT_TOKEN
-from database import init_db
 from handlers.start import start_command, help_command
 from handlers.wishlist import (
     add_wish_start,
@@ -23,6 +33,7 @@ from handlers.wishlist import (
     wish_image,
     cancel_add_wish,
     my_wishlist,
+    my_wishlist_more_callback,
     handle_menu_buttons,
     delete_wish_callback,
     confirm_delete_callback,
@@ -46,7 +57,10 @@ from handlers.wishlist import (
     EDIT_PRICE,
     EDIT_IMAGE,
 )
-from handlers.share import share_wishlist, view_shared_wishlist
+from handlers.share import share_wishlist, view_shared_wishlist, shared_page_callback
+from handlers.inline import inline_query_handler
+from services.wishlist_service import wishlist_service
+from update_processor import PerChatUpdateProcessor
 from keyboards import (
     MY_WISHLIST_BUTTON,
     ADD_WISH_BUTTON,
@@ -62,6 +76,45 @@ logger = logging.getLogger(__name__)
 
 
 
+# --- Bot that never holds a database connection while calling Telegram ---
+class WishlistBot(ExtBot):
+    """
+    Commits the current update's unit of work before every Bot API request,
+    so no session (or SQLite write lock) is held while waiting on Telegram.
+    Later queries of the update open a new session
+    """
+
+    async def _do_post(self, *args, **kwargs):
+        await release_connection()
+        return await super()._do_post(*args, **kwargs)
+
+
+# --- Application with one database unit of work per update ---
+class WishlistApplication(Application):
+    """Application that handles every update inside one database session"""
+
+    async def process_update(self, update: object) -> None:
+        async with unit_of_work():
+            # Make sure the sender exists with a current profile before any
+            # handler runs (free for users that were already seen)
+            if isinstance(update, Update) and update.effective_user:
+                user = update.effective_user
+                await wishlist_service.register_user(
+                    user_id=user.id,
+                    username=user.username,
+                    first_name=user.first_name,
+                )
+            await super().process_update(update)
+
+    async def process_error(self, update, error, job=None, coroutine=None) -> bool:
+        # Handler errors never reach process_update, so flag the unit of
+        # work here to roll back instead of committing a half-done update
+        uow = current_unit_of_work()
+        if uow is not None:
+            uow.failed = True
+        return await super().process_error(update, error, job=job, coroutine=coroutine)
+
+
 # --- Background task for Telegram notifications ---
 async def background_task(application: Application):
     while True:
@@ -78,6 +131,37 @@ async def background_task(application: Application):
         await asyncio.sleep(60)  # repeat interval in seconds
 
 
+# --- Periodic cache statistics ---
+async def log_cache_stats():
+    while True:
+        await asyncio.sleep(CACHE_STATS_INTERVAL)
+        for name, stats in wishlist_service.cache_stats().items():
+            logger.info(
+                f"📊 Cache '{name}': {stats.entries} entries, "
+                f"{stats.size_bytes / 1024:.0f} KB, hit rate {stats.hit_rate:.1%} "
+                f"({stats.hits} hits, {stats.misses} misses, "
+                f"{stats.evictions} evictions, {stats.expirations} expired)"
+            )
+
+
+# --- Periodic save of recently active users (for the startup warm-up) ---
+async def save_recent_users():
+    while True:
+        await asyncio.sleep(300)
+        wishlist_service.recent_users.save()
+
+
+async def warm_up_cache():
+    try:
+        await wishlist_service.warm_up()
+    except Exception as e:
+        logger.error(f"Cache warm-up failed: {e}")
+
+
+# Tasks started in on_startup and cancelled in on_shutdown
+background_tasks: list[asyncio.Task] = []
+
+
 # --- /start command with optional arguments ---
 async def start_with_args(update: Update, context: ContextTypes.DEFAULT_TYPE):
     if context.args and context.args[0].startswith("view_"):
@@ -86,17 +170,56 @@ async def start_with_args(update: Update, context: ContextTypes.DEFAULT_TYPE):
         await start_command(update, context)
 
 
+# --- Application lifecycle hooks ---
+async def on_startup(application: Application):
+    """Prepare the database before polling starts"""
+    await init_db()
+    logger.info("🔧 Database initialized")
+    await wishlist_service.start()
+
+    if CACHE_STATS_INTERVAL > 0:
+        background_tasks.append(asyncio.create_task(log_cache_stats()))
+    if CACHE_WARMUP_USERS > 0:
+        # Runs alongside polling, which does not wait for it
+        background_tasks.append(asyncio.create_task(warm_up_cache()))
+        background_tasks.append(asyncio.create_task(save_recent_users()))
+
+
+async def on_shutdown(application: Application):
+    """Stop background tasks and release database connections on exit"""
+    for task in background_tasks:
+        task.cancel()
+    await asyncio.gather(*background_tasks, return_exceptions=True)
+    background_tasks.clear()
+
+    await wishlist_service.stop()
+    await close_db()
+
+
 # --- Main async function ---
 def main():
     """Main function to run the bot"""
     logger.info("🚀 Starting bot...")
 
-    # Setup
-    init_db()
-    logger.info("🔧 Database initialized")
-
     # Create application
-    application = Application.builder().token(BOT_TOKEN).build()
+    application = (
+        Application.builder()
+        .application_class(WishlistApplication)
+        # A bot built outside the builder gets no connection pool of its
+        # own size: one connection per concurrent update, one for polling
+        .bot(
+            WishlistBot(
+                token=BOT_TOKEN,
+                request=HTTPXRequest(connection_pool_size=CONCURRENT_UPDATES),
+                get_updates_request=HTTPXRequest(),
+            )
+        )
+        # Parallel across chats, in order within one (conversations rely on it)
+        .concurrent_updates(PerChatUpdateProcessor(CONCURRENT_UPDATES))
+        .post_init(on_startup)
+        .post_shutdown(on_shutdown)
+        .build()
+    )
     logger.info("🤖 Application created")
 
     # --- Add handlers ---
@@ -172,6 +295,13 @@ def main():
     application.add_handler(
         CallbackQueryHandler(cancel_delete_callback, pattern="^cancel_delete$")
     )
+    application.add_handler(
+        CallbackQueryHandler(shared_page_callback, pattern=r"^shared_.+_\d+$")
+    )
+    application.add_handler(
+        CallbackQueryHandler(my_wishlist_more_callback, pattern=r"^my_wishes_.+_\d+$")
+    )
+    application.add_handler(InlineQueryHandler(inline_query_handler))
     application.add_handler(
         MessageHandler(filters.Regex(f"^{MY_WISHLIST_BUTTON}$"), my_wishlist)
     )
@@ -5,8 +5,53 @@ load_dotenv()
 
 BOT_TOKEN = os.getenv('BOT_TOKEN')
 DATABASE_URL = os.getenv('DATABASE_URL', 'sqlite:///wishlist.db')
+# Optional read replica; read-only queries go there, writes stay on DATABASE_URL
+DATABASE_READ_URL = os.getenv('DATABASE_READ_URL')
+# How long a user's reads stay on the primary after they wrote something
+DB_READ_AFTER_WRITE_SECONDS = float(os.getenv('DB_READ_AFTER_WRITE_SECONDS', '5'))
 
 if not BOT_TOKEN:
     raise ValueError("BOT_TOKEN not found! Check .env file")
 
-DB_ECHO =  False
\ No newline at end of file
+DB_ECHO =  False
+
+# Database engine profile: durable, fast or readonly (see database.py)
+DB_PROFILE = os.getenv('DB_PROFILE', 'durable')
+
+# SQLite single-writer queue: writes arriving within DB_WRITE_BATCH_MS
+# are committed together (at most DB_WRITE_BATCH_SIZE per transaction)
+DB_WRITE_QUEUE = os.getenv('DB_WRITE_QUEUE', 'true').lower() == 'true'
+DB_WRITE_BATCH_MS = float(os.getenv('DB_WRITE_BATCH_MS', '5'))
+DB_WRITE_BATCH_SIZE = int(os.getenv('DB_WRITE_BATCH_SIZE', '100'))
+
+# How many updates the bot may process at the same time (updates of one
+# chat and user still run one after another)
+CONCURRENT_UPDATES = int(os.getenv('CONCURRENT_UPDATES', '256'))
+
+# Wishlist cache limits (per process)
+CACHE_MAX_ENTRIES = int(os.getenv('CACHE_MAX_ENTRIES', '10000'))
+CACHE_MAX_BYTES = int(os.getenv('CACHE_MAX_BYTES', str(64 * 1024 * 1024)))
+CACHE_TTL_SECONDS = float(os.getenv('CACHE_TTL_SECONDS', '600'))
+# How long lookups that found nothing (unknown wish, user or share code) are remembered
+NEGATIVE_CACHE_TTL = float(os.getenv('NEGATIVE_CACHE_TTL', '30'))
+# Shared wishlist views are served from a snapshot that is refreshed in the
+# background once older than this (or after the owner changed something)
+SHARE_SNAPSHOT_TTL = float(os.getenv('SHARE_SNAPSHOT_TTL', '60'))
+# Startup warm-up: wishlists and profiles of the most recently active users
+# (remembered in ACTIVE_USERS_FILE) are prefetched; 0 disables
+CACHE_WARMUP_USERS = int(os.getenv('CACHE_WARMUP_USERS', '1000'))
+ACTIVE_USERS_FILE = os.getenv('ACTIVE_USERS_FILE', 'active_users.bin')
+# How often cache hit/miss statistics are logged (0 disables)
+CACHE_STATS_INTERVAL = float(os.getenv('CACHE_STATS_INTERVAL', '900'))
+# Shared wishlist views are counted in memory and written every this many seconds
+VIEW_COUNTS_FLUSH_INTERVAL = float(os.getenv('VIEW_COUNTS_FLUSH_INTERVAL', '30'))
+# Optional private chat (e.g. a channel with the bot as admin) that stores a
+# copy of every shared wish; viewers then get the list with copyMessages
+SHARE_STORAGE_CHAT_ID = int(os.getenv('SHARE_STORAGE_CHAT_ID') or 0) or None
+
+# Cache coherence between workers. With REDIS_URL the wishlist cache gets a
+# shared second level in Redis and invalidations are published there;
+# otherwise, when CACHE_SYNC_INTERVAL is set (e.g. 1), every worker polls the
+# cache_invalidations table that often. Off by default: one worker needs neither
+REDIS_URL = os.getenv('REDIS_URL')
+CACHE_SYNC_INTERVAL = float(os.getenv('CACHE_SYNC_INTERVAL', '0'))
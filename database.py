@@ -1,76 +1,695 @@
-from sqlalchemy import create_engine
-from sqlalchemy.orm import sessionmaker, Session
-from models import Base, User, Wish
-from config import DATABASE_URL, DB_ECHO
-from typing import Optional, List, Tuple
+import time
+from contextlib import asynccontextmanager
+from contextvars import ContextVar
+from datetime import datetime
+from sqlalchemy import case, delete, event, insert, make_url, or_, select, tuple_, update
+from sqlalchemy.dialects.postgresql import insert as postgresql_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.ext.asyncio import (
+    AsyncEngine,
+    AsyncSession,
+    async_sessionmaker,
+    create_async_engine,
+)
+from sqlalchemy.pool import AsyncAdaptedQueuePool
+from models import (
+    Base,
+    CacheInvalidation,
+    SharedMessage,
+    TelegramFile,
+    User,
+    Wish,
+    TelegramFileView,
+    UserView,
+    WishView,
+)
+from config import (
+    DATABASE_URL,
+    DATABASE_READ_URL,
+    DB_READ_AFTER_WRITE_SECONDS,
+    DB_ECHO,
+    DB_PROFILE,
+    DB_WRITE_QUEUE,
+    DB_WRITE_BATCH_MS,
+    DB_WRITE_BATCH_SIZE,
+    REDIS_URL,
+    CACHE_SYNC_INTERVAL,
+    CACHE_MAX_ENTRIES,
+)
+from services.cache import LRUCache
+from write_queue import WriteQueue
+from typing import AsyncIterator, Awaitable, Callable, Dict, Optional, List, Tuple, TypeVar
 
-engine = create_engine(DATABASE_URL, echo=DB_ECHO)
 
-SessionLocal = sessionmaker(bind=engine)
+def get_async_url(url: str) -> str:
+    """Switch a database URL to its asyncio driver (aiosqlite / asyncpg)"""
+    if url.startswith("sqlite:"):
+        return url.replace("sqlite:", "sqlite+aiosqlite:", 1)
+    if url.startswith("postgresql:"):
+        return url.replace("postgresql:", "postgresql+asyncpg:", 1)
+    if url.startswith("postgres:"):
+        return url.replace("postgres:", "postgresql+asyncpg:", 1)
+    return url
 
 
-def init_db():
+# Named engine profiles (DB_PROFILE in config.py).
+# PRAGMAs are applied to every new SQLite connection; pool settings apply
+# to every backend except in-memory SQLite.
+ENGINE_PROFILES = {
+    # Safe default: WAL with a full fsync per commit
+    "durable": {
+        "pragmas": {
+            "journal_mode": "WAL",
+            "synchronous": "FULL",
+            "busy_timeout": 5000,
+            "foreign_keys": "ON",
+            "cache_size": -16000,  # 16 MB
+            "temp_store": "MEMORY",
+        },
+        "pool_size": 5,
+        "max_overflow": 10,
+    },
+    # WAL with fsync only at checkpoints: a power loss may drop the last
+    # commits, but the database is never corrupted
+    "fast": {
+        "pragmas": {
+            "journal_mode": "WAL",
+            "synchronous": "NORMAL",
+            "busy_timeout": 5000,
+            "foreign_keys": "ON",
+            "cache_size": -64000,  # 64 MB
+            "mmap_size": 268435456,  # 256 MB
+            "temp_store": "MEMORY",
+        },
+        "pool_size": 10,
+        "max_overflow": 20,
+    },
+    # Read-only connections (e.g. a reader pool on the same file)
+    "readonly": {
+        "pragmas": {
+            "query_only": "ON",
+            "busy_timeout": 5000,
+            "cache_size": -64000,
+            "mmap_size": 268435456,
+            "temp_store": "MEMORY",
+        },
+        "pool_size": 10,
+        "max_overflow": 20,
+    },
+}
+
+
+def _setup_sqlite_connections(db_engine: AsyncEngine, pragmas: dict):
+    """Apply PRAGMAs on connect and let SQLAlchemy control transactions"""
+
+    @event.listens_for(db_engine.sync_engine, "connect")
+    def on_connect(dbapi_connection, connection_record):
+        # Disable the driver's implicit BEGIN (it breaks SAVEPOINT and
+        # PRAGMA journal_mode); BEGIN is emitted in on_begin instead
+        dbapi_connection.isolation_level = None
+        cursor = dbapi_connection.cursor()
+        for name, value in pragmas.items():
+            cursor.execute(f"PRAGMA {name}={value}")
+        cursor.close()
+
+    @event.listens_for(db_engine.sync_engine, "begin")
+    def on_begin(conn):
+        conn.exec_driver_sql("BEGIN")
+
+
+def create_db_engine(url: str, profile: str = DB_PROFILE) -> AsyncEngine:
+    """Create an async engine configured with one of ENGINE_PROFILES"""
+    if profile not in ENGINE_PROFILES:
+        raise ValueError(
+            f"Unknown DB_PROFILE '{profile}'. "
+            f"Choose one of: {', '.join(ENGINE_PROFILES)}"
+        )
+    settings = ENGINE_PROFILES[profile]
+
+    db_url = make_url(get_async_url(url))
+    is_sqlite = db_url.get_backend_name() == "sqlite"
+    in_memory = is_sqlite and db_url.database in (None, "", ":memory:")
+
+    options = {"echo": DB_ECHO}
+    if not in_memory:
+        options.update(
+            poolclass=AsyncAdaptedQueuePool,
+            pool_size=settings["pool_size"],
+            max_overflow=settings["max_overflow"],
+            pool_pre_ping=not is_sqlite,
+        )
+
+    db_engine = create_async_engine(db_url, **options)
+    if is_sqlite:
+        _setup_sqlite_connections(db_engine, settings["pragmas"])
+    return db_engine
+
+
+engine = create_db_engine(DATABASE_URL)
+
+# Optional read replica: read-only queries are routed to it
+read_engine = create_db_engine(DATABASE_READ_URL, "readonly") if DATABASE_READ_URL else None
+
+# Single writer with group commit, started by init_db for file-based SQLite
+_write_queue: Optional[WriteQueue] = None
+
+T = TypeVar("T")
+
+# expire_on_commit=False keeps loaded attributes usable after the session
+# is closed - lazy loading is not available with AsyncSession
+SessionLocal = async_sessionmaker(bind=engine, expire_on_commit=False)
+ReadSessionLocal = (
+    async_sessionmaker(bind=read_engine, expire_on_commit=False)
+    if read_engine
+    else None
+)
+
+# user_id -> monotonic time of the user's last write. For
+# DB_READ_AFTER_WRITE_SECONDS afterwards their reads go to the primary,
+# so a lagging replica never hides their own changes
+_recent_writes: Dict[int, float] = {}
+
+# Writes record cache invalidations in the database unless Redis carries them
+CACHE_CHANGELOG = CACHE_SYNC_INTERVAL > 0 and not REDIS_URL
+
+# Wish columns that may be changed through update_wish
+UPDATABLE_WISH_FIELDS = ("title", "description", "url", "price", "image_file_id")
+
+USER_VIEW_COLUMNS = (
+    User.user_id,
+    User.username,
+    User.first_name,
+    User.is_public,
+    User.wish_count,
+    User.list_version,
+    User.share_code,
+    User.share_views,
+    User.created_at,
+)
+
+
+def _wish_view_columns() -> tuple:
+    """Columns loaded into a WishView"""
+    return (
+        Wish.wish_id,
+        Wish.user_id,
+        Wish.title,
+        Wish.description,
+        Wish.url,
+        Wish.price,
+        Wish.image_file_id,
+        Wish.created_at,
+        Wish.updated_at,
+    )
+
+
+async def init_db():
     """Database Initialization - Creating All Tables"""
-    Base.metadata.create_all(bind=engine)
+    global _write_queue
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+
+    is_file_sqlite = engine.dialect.name == "sqlite" and engine.url.database not in (
+        None,
+        "",
+        ":memory:",
+    )
+    if DB_WRITE_QUEUE and is_file_sqlite and _write_queue is None:
+        _write_queue = WriteQueue(
+            engine,
+            batch_window=DB_WRITE_BATCH_MS / 1000,
+            max_batch=DB_WRITE_BATCH_SIZE,
+        )
+        await _write_queue.start()
     print("✅ Database initialized")
 
 
-def get_db() -> Session:
-    """Getting a database session"""
-    db = SessionLocal()
+async def close_db():
+    """Flush pending writes and close all pooled database connections"""
+    global _write_queue
+    if _write_queue is not None:
+        await _write_queue.stop()
+        _write_queue = None
+    await engine.dispose()
+    if read_engine is not None:
+        await read_engine.dispose()
+
+
+# === Unit of work ===
+
+
+class UnitOfWork:
+    """
+    One session (and transaction) shared by every database call made while
+    handling a single update. Sessions are opened lazily, so updates that
+    never touch the database cost nothing. With a read replica configured,
+    a second session serves the update's reads until it writes. Before the
+    update talks to Telegram its work so far is committed and the sessions
+    are closed (see release).
+    """
+
+    def __init__(self):
+        self._session: Optional[AsyncSession] = None
+        self._read_session: Optional[AsyncSession] = None
+        self._on_commit: List[Callable[[], None]] = []
+        self.failed = False
+        self.wrote = False
+        # The open transaction has written (holds SQLite's write lock)
+        self.writing = False
+
+    @property
+    def session(self) -> AsyncSession:
+        if self._session is None:
+            self._session = SessionLocal()
+        return self._session
+
+    @property
+    def read_session(self) -> AsyncSession:
+        if self._read_session is None:
+            self._read_session = ReadSessionLocal()
+        return self._read_session
+
+    def on_commit(self, callback: Callable[[], None]):
+        """Run callback once the unit of work has been committed"""
+        self._on_commit.append(callback)
+
+    async def release(self):
+        """
+        Commit the work done so far and give the connections back to the
+        pool; later queries open new sessions
+        """
+        if self.failed:
+            await self.rollback()
+        else:
+            await self.commit()
+        await self.close()
+
+    async def end_transaction(self):
+        """Finish the current transaction so later reads see newer commits"""
+        if self._session is not None and self._session.in_transaction():
+            await self.commit()
+
+    async def commit(self):
+        self.writing = False
+        if self._session is not None:
+            await self._session.commit()
+        for callback in self._on_commit:
+            callback()
+        self._on_commit.clear()
+
+    async def rollback(self):
+        self.writing = False
+        self._on_commit.clear()
+        if self._session is not None:
+            await self._session.rollback()
+
+    async def close(self):
+        self.writing = False
+        if self._session is not None:
+            await self._session.close()
+            self._session = None
+        if self._read_session is not None:
+            await self._read_session.close()
+            self._read_session = None
+
+
+_current_uow: ContextVar[Optional[UnitOfWork]] = ContextVar(
+    "current_uow", default=None
+)
+
+
+def current_unit_of_work() -> Optional[UnitOfWork]:
+    """Unit of work of the update being handled, if any"""
+    return _current_uow.get()
+
+
+@asynccontextmanager
+async def unit_of_work() -> AsyncIterator[UnitOfWork]:
+    """
+    Run a block inside one unit of work.
+    Commits once at the end, or rolls back if the block raised or
+    the unit of work was marked as failed.
+    """
+    uow = UnitOfWork()
+    token = _current_uow.set(uow)
     try:
-        return db
-    except Exception as e:
-        db.close()
-        raise e
+        yield uow
+        if uow.failed:
+            await uow.rollback()
+        else:
+            await uow.commit()
+    except BaseException:
+        await uow.rollback()
+        raise
+    finally:
+        _current_uow.reset(token)
+        await uow.close()
+
+
+async def release_connection():
+    """
+    Let the current update hold no connection while it waits on Telegram:
+    commits its work so far (see UnitOfWork.release). Called by the bot
+    before every API request
+    """
+    uow = _current_uow.get()
+    if uow is not None:
+        await uow.release()
+
+
+def after_commit(callback: Callable[[], None]):
+    """
+    Run callback once the current write is durable: when the update's open
+    transaction wrote it, at the end of that transaction; otherwise right
+    away (session_scope or the write queue has already committed it)
+    """
+    uow = _current_uow.get()
+    if uow is not None and uow.writing:
+        uow.on_commit(callback)
+    else:
+        callback()
+
+
+@asynccontextmanager
+async def session_scope() -> AsyncIterator[AsyncSession]:
+    """
+    Session for a single database function.
+    Inside a unit of work the shared session is reused and committing is
+    left to the unit of work; otherwise a short-lived session is opened
+    and committed on exit.
+    """
+    uow = _current_uow.get()
+    if uow is not None:
+        yield uow.session
+        return
+
+    async with SessionLocal() as db:
+        async with db.begin():
+            yield db
+
+
+def _reads_from_primary(uow: Optional[UnitOfWork], user_id: Optional[int]) -> bool:
+    """Whether a read must see this update's or this user's recent writes"""
+    if uow is not None and uow.wrote:
+        return True
+    if user_id is None:
+        return False
+    written_at = _recent_writes.get(user_id)
+    return (
+        written_at is not None
+        and time.monotonic() - written_at < DB_READ_AFTER_WRITE_SECONDS
+    )
+
+
+@asynccontextmanager
+async def read_scope(user_id: Optional[int] = None) -> AsyncIterator[AsyncSession]:
+    """
+    Session for a read-only query.
+    Uses the read replica when one is configured, except right after a
+    write by the same update or the same user (read-your-own-writes).
+    """
+    uow = _current_uow.get()
+    if ReadSessionLocal is None or _reads_from_primary(uow, user_id):
+        async with session_scope() as db:
+            yield db
+        return
+
+    if uow is not None:
+        yield uow.read_session
+        return
+
+    async with ReadSessionLocal() as db:
+        yield db
+
+
+def _remember_write(user_id: Optional[int]):
+    """Route the user's reads to the primary for a while"""
+    uow = _current_uow.get()
+    if uow is not None:
+        uow.wrote = True
+    if user_id is None or ReadSessionLocal is None:
+        return
+
+    now = time.monotonic()
+    _recent_writes[user_id] = now
+    if len(_recent_writes) > 10000:
+        for key, written_at in list(_recent_writes.items()):
+            if now - written_at >= DB_READ_AFTER_WRITE_SECONDS:
+                del _recent_writes[key]
+
+
+async def run_write(
+    op: Callable[[AsyncSession], Awaitable[T]], user_id: Optional[int] = None
+) -> T:
+    """
+    Run a write operation on the primary.
+    With the write queue it is committed in the writer's next batch;
+    otherwise it runs in session_scope like any other query.
+    `user_id` is the owner of the written data (for read-your-own-writes).
+    """
+    _remember_write(user_id)
+
+    if _write_queue is None:
+        uow = _current_uow.get()
+        if uow is not None and not uow.writing and engine.dialect.name == "sqlite":
+            # A deferred SQLite transaction that has only read fails with
+            # "database is locked" instead of waiting when it starts writing
+            # after another commit: write from a fresh transaction
+            await uow.end_transaction()
+        async with session_scope() as db:
+            result = await op(db)
+        if uow is not None:
+            uow.writing = True
+        return result
+
+    result = await _write_queue.submit(op)
+
+    # The write was committed on the writer's connection: end the update's
+    # read transaction so its next query does not read an older snapshot
+    uow = _current_uow.get()
+    if uow is not None:
+        await uow.end_transaction()
+    return result
 
 
 # === Functions for working with users ===
 
 
-def get_or_create_user(
-    user_id: int, username: str = None, first_name: str = None
-) -> User:
-    """Get a user or create a new user"""
-    db = get_db()
-    try:
-        user = db.query(User).filter(User.user_id == user_id).first()
+# Users whose row is known to exist with the current profile data:
+# user_id -> hash of (username, first_name). Bounded: a forgotten user
+# only costs one upsert that changes nothing
+_known_users = LRUCache(max_entries=CACHE_MAX_ENTRIES)
 
-        if not user:
-            user = User(user_id=user_id, username=username, first_name=first_name)
-            db.add(user)
-            db.commit()
-            db.refresh(user)
-            print(f"A new user created: {user_id}")
 
-        return user
-    finally:
-        db.close()
+def _insert(model):
+    """INSERT construct of the active dialect (supports ON CONFLICT)"""
+    if engine.dialect.name == "postgresql":
+        return postgresql_insert(model)
+    return sqlite_insert(model)
+
+
+async def upsert_user(
+    user_id: int,
+    username: str = None,
+    first_name: str = None,
+    share_code: Optional[str] = None
+) -> bool:
+    """
+    Create the user or refresh a changed username/first_name in one
+    INSERT ... ON CONFLICT DO UPDATE statement.
+    `share_code` is only stored for a new user.
+    Users already seen with the same profile skip the database entirely.
+    Returns True if a row was inserted or changed.
+    """
+    profile = hash((username, first_name))
+    if _known_users.get(user_id) == profile:
+        return False
+
+    stmt = _insert(User).values(
+        user_id=user_id, username=username, first_name=first_name, share_code=share_code
+    )
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[User.user_id],
+        set_={
+            "username": stmt.excluded.username,
+            "first_name": stmt.excluded.first_name,
+        },
+        where=or_(
+            User.username.is_distinct_from(stmt.excluded.username),
+            User.first_name.is_distinct_from(stmt.excluded.first_name),
+        ),
+    )
+
+    async def op(db: AsyncSession) -> bool:
+        result = await db.execute(stmt)
+        return result.rowcount > 0
 
+    changed = await run_write(op, user_id)
 
-def get_user(user_id: int) -> Optional[User]:
+    def remember():
+        _known_users.set(user_id, profile)
+
+    after_commit(remember)
+    return changed
+
+
+async def get_user(user_id: int) -> Optional[UserView]:
     """Get user by id"""
-    db = get_db()
-    try:
-        return db.query(User).filter(User.user_id == user_id).first()
-    finally:
-        db.close()
+    async with read_scope(user_id) as db:
+        user = await db.get(User, user_id)
+        return UserView.from_model(user) if user else None
+
+
+async def get_wish_count(user_id: int) -> int:
+    """Get the number of user`s wishes (primary key lookup, no wish rows loaded)"""
+    async with read_scope(user_id) as db:
+        result = await db.execute(
+            select(User.wish_count).where(User.user_id == user_id)
+        )
+        return result.scalar_one_or_none() or 0
+
+
+async def get_users(user_ids: List[int]) -> List[UserView]:
+    """Get several users in one query"""
+    async with read_scope() as db:
+        result = await db.execute(
+            select(*USER_VIEW_COLUMNS).where(User.user_id.in_(user_ids))
+        )
+        return [UserView(**row._mapping) for row in result]
+
+
+def prime_known_users(users: List[UserView]):
+    """Mark users as stored with their current profile, so upsert_user skips them"""
+    for user in users:
+        _known_users.set(user.user_id, hash((user.username, user.first_name)))
+
+
+async def get_user_by_share_code(share_code: str) -> Optional[UserView]:
+    """Get the user a share code belongs to (idx_users_share_code lookup)"""
+    async with read_scope() as db:
+        result = await db.execute(
+            select(*USER_VIEW_COLUMNS).where(User.share_code == share_code)
+        )
+        row = result.first()
+        return UserView(**row._mapping) if row else None
+
+
+async def get_share_codes(changed_since: Optional[datetime] = None) -> List[str]:
+    """All share codes, or the ones set since the given time"""
+    stmt = select(User.share_code).where(User.share_code.is_not(None))
+    if changed_since is not None:
+        stmt = stmt.where(User.share_code_changed_at >= changed_since)
+    async with read_scope() as db:
+        result = await db.execute(stmt)
+        return list(result.scalars())
+
+
+async def set_share_code(user_id: int, share_code: Optional[str]) -> Optional[str]:
+    """
+    Replace the user's share code (None revokes sharing)
+    Returns: the previous code
+    """
+
+    async def op(db: AsyncSession) -> Optional[str]:
+        # Write first so SQLite takes the write lock before the read
+        await db.execute(
+            update(User)
+            .where(User.user_id == user_id)
+            .values(share_code_changed_at=datetime.utcnow())
+        )
+        previous = await db.scalar(
+            select(User.share_code).where(User.user_id == user_id)
+        )
+        await db.execute(
+            update(User)
+            .where(User.user_id == user_id)
+            .values(share_code=share_code)
+        )
+        # Other workers drop what they cached for the old code
+        await _log_invalidation(db, user_id, None)
+        return previous
+
+    return await run_write(op, user_id)
+
+
+# === Cache invalidation changelog ===
+
+
+async def _log_invalidation(db: AsyncSession, user_id: int, list_version: Optional[int]):
+    """
+    Record in the write's own transaction that the user's wishlist changed
+    (list_version None: drop everything cached for the user)
+    """
+    if CACHE_CHANGELOG:
+        await db.execute(
+            insert(CacheInvalidation).values(user_id=user_id, list_version=list_version)
+        )
+
+
+async def get_cache_invalidations(
+    since: datetime,
+) -> List[Tuple[int, int, Optional[int]]]:
+    """(id, user_id, list_version) of the invalidations recorded since the given time"""
+    # Always the primary: a lagging replica would hide fresh invalidations
+    async with SessionLocal() as db:
+        result = await db.execute(
+            select(
+                CacheInvalidation.id,
+                CacheInvalidation.user_id,
+                CacheInvalidation.list_version,
+            ).where(CacheInvalidation.created_at >= since)
+        )
+        return [(row.id, row.user_id, row.list_version) for row in result]
+
+
+async def prune_cache_invalidations(before: datetime) -> int:
+    """Delete invalidations recorded before the given time"""
+
+    async def op(db: AsyncSession) -> int:
+        result = await db.execute(
+            delete(CacheInvalidation).where(CacheInvalidation.created_at < before)
+        )
+        return result.rowcount
+
+    return await run_write(op)
 
 
 # === Functions for working with wishes ===
 
 
-def add_wish(
+async def _wishes_changed(db: AsyncSession, user_id: int, count_delta: int = 0) -> int:
+    """
+    Bump the user`s list version (and adjust the wish counter) in the
+    current transaction. Returns the new list version.
+    """
+    values = {"list_version": User.list_version + 1}
+    if count_delta:
+        values["wish_count"] = User.wish_count + count_delta
+    result = await db.execute(
+        update(User)
+        .where(User.user_id == user_id)
+        .values(**values)
+        .returning(User.list_version)
+    )
+    list_version = result.scalar_one()
+    await _log_invalidation(db, user_id, list_version)
+    return list_version
+
+
+async def add_wish(
     user_id: int,
     title: str,
     description: str = None,
     url: str = None,
     price: str = None,
     image_file_id: str = None,
-) -> Wish:
-    """Add a new wish"""
-    db = get_db()
-    try:
+) -> Tuple[WishView, int]:
+    """
+    Add a new wish
+    Returns: (wish, new list version of the user)
+    """
+
+    async def op(db: AsyncSession) -> Tuple[WishView, int]:
         wish = Wish(
             user_id=user_id,
             title=title,
@@ -80,74 +699,268 @@ def add_wish(
             image_file_id=image_file_id,
         )
         db.add(wish)
-        db.commit()
-        db.refresh(wish)
-        print(f"✅ A wish added: {title} for user {user_id}")
-        return wish
-    finally:
-        db.close()
+        await db.flush()
+        list_version = await _wishes_changed(db, user_id, count_delta=1)
+        return WishView.from_model(wish), list_version
 
+    wish, list_version = await run_write(op, user_id)
+    print(f"✅ A wish added: {title} for user {user_id}")
+    return wish, list_version
 
-def get_user_wishes(user_id: int) -> List[Wish]:
-    """Get all user`s wishes"""
-    db = get_db()
-    try:
-        wishes = (
-            db.query(Wish)
-            .filter(Wish.user_id == user_id)
-            .order_by(Wish.created_at.desc())
-            .all()
+
+async def get_versioned_wishes(user_id: int) -> Tuple[List[WishView], int]:
+    """
+    Get all user`s wishes and the list version they belong to.
+    The version is read first: a write committed in between can only make
+    the list newer than its version, never older.
+    """
+    async with read_scope(user_id) as db:
+        result = await db.execute(
+            select(User.list_version).where(User.user_id == user_id)
         )
-        return wishes
-    finally:
-        db.close()
+        list_version = result.scalar_one_or_none() or 0
+        result = await db.execute(
+            select(*_wish_view_columns())
+            .where(Wish.user_id == user_id)
+            .order_by(Wish.created_at.desc(), Wish.wish_id.desc())
+        )
+        return [WishView(**row._mapping) for row in result], list_version
 
 
-def get_wish(wish_id: int) -> Optional[Wish]:
-    """Get a wish by id"""
-    db = get_db()
-    try:
-        return db.query(Wish).filter(Wish.wish_id == wish_id).first()
-    finally:
-        db.close()
+async def get_wishes_of_users(user_ids: List[int]) -> Dict[int, List[WishView]]:
+    """Get the wishes of several users in one query (each list newest first)"""
+    wishes: Dict[int, List[WishView]] = {user_id: [] for user_id in user_ids}
+    async with read_scope() as db:
+        result = await db.execute(
+            select(*_wish_view_columns())
+            .where(Wish.user_id.in_(user_ids))
+            .order_by(Wish.user_id, Wish.created_at.desc(), Wish.wish_id.desc())
+        )
+        for row in result:
+            wishes[row.user_id].append(WishView(**row._mapping))
+    return wishes
 
 
-def delete_wish(wish_id: int, user_id: int) -> bool:
-    """Delete a wish (only if it belongs to the user)"""
-    db = get_db()
-    try:
-        wish = (
-            db.query(Wish)
-            .filter(Wish.wish_id == wish_id, Wish.user_id == user_id)
-            .first()
-        )
-        if wish:
-            db.delete(wish)
-            db.commit()
-            print(f"A wish deleted: {wish_id}")
-            return True
-        return False
-    finally:
-        db.close()
+async def get_user_wishes_page(
+    user_id: int,
+    limit: int,
+    after: Optional[Tuple[datetime, int]] = None,
+) -> List[WishView]:
+    """
+    Get one page of user`s wishes, newest first.
+    `after` is the (created_at, wish_id) of the last wish of the previous
+    page; the seek runs on the idx_user_created index instead of OFFSET.
+    """
+    stmt = select(*_wish_view_columns()).where(
+        Wish.user_id == user_id
+    )
+    if after is not None:
+        stmt = stmt.where(tuple_(Wish.created_at, Wish.wish_id) < tuple_(*after))
+    stmt = stmt.order_by(Wish.created_at.desc(), Wish.wish_id.desc()).limit(limit)
 
+    async with read_scope(user_id) as db:
+        result = await db.execute(stmt)
+        return [WishView(**row._mapping) for row in result]
 
-def update_wish(wish_id: int, user_id: int, **kwargs) -> Optional[Wish]:
-    """Update the wish"""
-    db = get_db()
-    try:
-        wish = (
-            db.query(Wish)
-            .filter(Wish.wish_id == wish_id, Wish.user_id == user_id)
-            .first()
-        )
-        if wish:
-            for key, value in kwargs.items():
-                if hasattr(wish, key) and value is not None:
-                    setattr(wish, key, value)
-            db.commit()
-            db.refresh(wish)
-            print(f"The wish updated: {wish_id}")
-            return wish
-        return None
-    finally:
-        db.close()
+
+async def get_wish(wish_id: int, user_id: Optional[int] = None) -> Optional[WishView]:
+    """
+    Get a wish by id (served from the identity map when already loaded)
+    `user_id` of the expected owner only routes the read after own writes
+    """
+    async with read_scope(user_id) as db:
+        wish = await db.get(Wish, wish_id)
+        return WishView.from_model(wish) if wish else None
+
+
+async def delete_wish(wish_id: int, user_id: int) -> Optional[int]:
+    """
+    Delete a wish (only if it belongs to the user)
+    Single DELETE ... RETURNING: None means not found or not yours,
+    otherwise the new list version of the user is returned
+    """
+
+    async def op(db: AsyncSession) -> Optional[int]:
+        result = await db.execute(
+            delete(Wish)
+            .where(Wish.wish_id == wish_id, Wish.user_id == user_id)
+            .returning(Wish.wish_id)
+        )
+        if result.scalar_one_or_none() is None:
+            return None
+        # Wish ids are reused, so its storage chat copy must not outlive it
+        await db.execute(delete(SharedMessage).where(SharedMessage.wish_id == wish_id))
+        return await _wishes_changed(db, user_id, count_delta=-1)
+
+    list_version = await run_write(op, user_id)
+    if list_version is not None:
+        print(f"A wish deleted: {wish_id}")
+    return list_version
+
+
+async def update_wish(
+    wish_id: int, user_id: int, **kwargs
+) -> Tuple[Optional[WishView], Optional[int]]:
+    """
+    Update the wish (only if it belongs to the user)
+    Single UPDATE ... RETURNING: None means not found or not yours.
+    Unknown fields and None values are ignored.
+    Returns: (wish, new list version of the user or None if nothing changed)
+    """
+    values = {
+        key: value
+        for key, value in kwargs.items()
+        if key in UPDATABLE_WISH_FIELDS and value is not None
+    }
+    ownership = (Wish.wish_id == wish_id, Wish.user_id == user_id)
+
+    if not values:
+        async with session_scope() as db:
+            result = await db.execute(
+                select(*_wish_view_columns()).where(*ownership)
+            )
+            row = result.first()
+            return (WishView(**row._mapping) if row else None), None
+
+    async def op(db: AsyncSession) -> Tuple[Optional[WishView], Optional[int]]:
+        result = await db.execute(
+            update(Wish)
+            .where(*ownership)
+            .values(**values)
+            .returning(*_wish_view_columns())
+        )
+        row = result.first()
+        if row is None:
+            return None, None
+        list_version = await _wishes_changed(db, user_id)
+        return WishView(**row._mapping), list_version
+
+    wish, list_version = await run_write(op, user_id)
+    if wish:
+        print(f"The wish updated: {wish_id}")
+    return wish, list_version
+
+
+# === Shared view counters ===
+
+
+async def _add_counts(db: AsyncSession, key, column, counts: Dict[int, int], **values):
+    """column += counts[key] for every key in counts, 500 rows per UPDATE ... CASE"""
+    items = list(counts.items())
+    for i in range(0, len(items), 500):
+        chunk = dict(items[i:i + 500])
+        await db.execute(
+            update(key.class_)
+            .where(key.in_(chunk))
+            .values({column: column + case(chunk, value=key, else_=0), **values})
+        )
+
+
+async def add_view_counts(share_views: Dict[int, int], wish_views: Dict[int, int]):
+    """Add batched view counts: {user_id: views} and {wish_id: views}"""
+
+    async def op(db: AsyncSession):
+        await _add_counts(db, User.user_id, User.share_views, share_views)
+        # Not an edit of the wish: keep updated_at
+        await _add_counts(
+            db, Wish.wish_id, Wish.view_count, wish_views, updated_at=Wish.updated_at
+        )
+
+    await run_write(op)
+
+
+# === Shared message copies ===
+
+
+async def get_shared_messages(owner_id: int) -> Dict[int, Tuple[int, Optional[datetime]]]:
+    """{wish_id: (message_id, wish_updated_at)} of the owner's stored wishes"""
+    async with read_scope() as db:
+        result = await db.execute(
+            select(
+                SharedMessage.wish_id,
+                SharedMessage.message_id,
+                SharedMessage.wish_updated_at,
+            ).where(SharedMessage.owner_id == owner_id)
+        )
+        return {row.wish_id: (row.message_id, row.wish_updated_at) for row in result}
+
+
+async def save_shared_messages(
+    owner_id: int,
+    messages: Dict[int, Tuple[int, Optional[datetime]]],
+    removed: List[int],
+):
+    """Store new copies ({wish_id: (message_id, wish_updated_at)}) and forget removed wishes"""
+
+    async def op(db: AsyncSession):
+        if removed:
+            await db.execute(
+                delete(SharedMessage).where(
+                    SharedMessage.owner_id == owner_id, SharedMessage.wish_id.in_(removed)
+                )
+            )
+        if messages:
+            stmt = _insert(SharedMessage).values([
+                {
+                    "wish_id": wish_id,
+                    "owner_id": owner_id,
+                    "message_id": message_id,
+                    "wish_updated_at": updated_at,
+                }
+                for wish_id, (message_id, updated_at) in messages.items()
+            ])
+            stmt = stmt.on_conflict_do_update(
+                index_elements=[SharedMessage.wish_id],
+                set_={
+                    # The wish id may have belonged to another owner's deleted wish
+                    "owner_id": stmt.excluded.owner_id,
+                    "message_id": stmt.excluded.message_id,
+                    "wish_updated_at": stmt.excluded.wish_updated_at,
+                },
+            )
+            await db.execute(stmt)
+
+    await run_write(op)
+
+
+# === Telegram files ===
+
+
+async def get_telegram_file(
+    file_unique_id: Optional[str] = None, file_id: Optional[str] = None
+) -> Optional[TelegramFileView]:
+    """Get a stored getFile result by file_unique_id (preferred) or file_id"""
+    if file_unique_id is not None:
+        condition = TelegramFile.file_unique_id == file_unique_id
+    else:
+        condition = TelegramFile.file_id == file_id
+
+    async with read_scope() as db:
+        result = await db.execute(select(TelegramFile).where(condition).limit(1))
+        telegram_file = result.scalar_one_or_none()
+        return TelegramFileView.from_model(telegram_file) if telegram_file else None
+
+
+async def save_telegram_file(telegram_file: TelegramFileView):
+    """Store a getFile result, replacing the previous one for the same file"""
+    stmt = _insert(TelegramFile).values(
+        file_unique_id=telegram_file.file_unique_id,
+        file_id=telegram_file.file_id,
+        file_path=telegram_file.file_path,
+        file_size=telegram_file.file_size,
+        fetched_at=telegram_file.fetched_at,
+    )
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[TelegramFile.file_unique_id],
+        set_={
+            "file_id": stmt.excluded.file_id,
+            "file_path": stmt.excluded.file_path,
+            "file_size": stmt.excluded.file_size,
+            "fetched_at": stmt.excluded.fetched_at,
+        },
+    )
+
+    async def op(db: AsyncSession):
+        await db.execute(stmt)
+
+    await run_write(op)
@@ -0,0 +1,95 @@
+from typing import List
+from telegram import (
+    Update,
+    InlineQueryResultArticle,
+    InlineQueryResultCachedPhoto,
+    InlineQueryResultsButton,
+    InputTextMessageContent,
+)
+from telegram.constants import InlineQueryLimit, MessageLimit
+from telegram.ext import ContextTypes
+from services.wishlist_service import wishlist_service
+from services.cache import LRUCache
+from handlers.wishlist import render_wish_detail
+from config import CACHE_MAX_ENTRIES, CACHE_TTL_SECONDS
+
+# Seconds Telegram may serve an answer from its own cache (results are per user)
+INLINE_CACHE_TIME = 30
+
+# user_id -> (wishes, results). Rebuilt once the cached wishlist is replaced,
+# so repeated queries while typing reuse the same results
+_inline_results = LRUCache(max_entries=CACHE_MAX_ENTRIES, ttl=CACHE_TTL_SECONDS)
+
+
+def build_inline_result(wish):
+    """Inline result sending one wish (as a photo when it has one)"""
+    rendered = render_wish_detail(wish)
+    summary = " · ".join(filter(None, (wish.price, wish.description)))[:100] or None
+
+    # Captions are shorter than messages: long ones go as text
+    if rendered.photo and len(rendered.text) <= MessageLimit.CAPTION_LENGTH:
+        return InlineQueryResultCachedPhoto(
+            id=str(wish.wish_id),
+            photo_file_id=rendered.photo,
+            title=wish.title,
+            description=summary,
+            caption=rendered.text,
+            parse_mode=rendered.parse_mode,
+        )
+    return InlineQueryResultArticle(
+        id=str(wish.wish_id),
+        title=wish.title,
+        description=summary,
+        input_message_content=InputTextMessageContent(
+            rendered.text, parse_mode=rendered.parse_mode
+        ),
+    )
+
+
+async def get_inline_results(user_id: int) -> tuple[List, List]:
+    """The user's wishes and their inline results (from cache when unchanged)"""
+    wishes = await wishlist_service.get_user_wishes(user_id)
+    cached = _inline_results.get(user_id)
+    if cached is not None and cached[0] is wishes:
+        return cached
+
+    cached = (wishes, [build_inline_result(wish) for wish in wishes])
+    _inline_results.set(user_id, cached)
+    return cached
+
+
+async def inline_query_handler(update: Update, context: ContextTypes.DEFAULT_TYPE):
+    """Share your wishes in any chat: @bot [part of a title]"""
+    query = update.inline_query
+    wishes, results = await get_inline_results(query.from_user.id)
+
+    if not wishes:
+        await query.answer(
+            [],
+            cache_time=INLINE_CACHE_TIME,
+            is_personal=True,
+            button=InlineQueryResultsButton(
+                text="📝 Your wishlist is empty - add a wish", start_parameter="inline"
+            ),
+        )
+        return
+
+    search = query.query.strip().lower()
+    if search:
+        results = [
+            result for wish, result in zip(wishes, results)
+            if search in wish.title.lower()
+        ]
+
+    # At most 50 results per answer, Telegram asks for more with the offset
+    try:
+        offset = max(int(query.offset or 0), 0)
+    except ValueError:
+        offset = 0
+    end = offset + InlineQueryLimit.RESULTS
+    await query.answer(
+        results[offset:end],
+        cache_time=INLINE_CACHE_TIME,
+        is_personal=True,
+        next_offset=str(end) if end < len(results) else "",
+    )
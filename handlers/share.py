@@ -1,29 +1,60 @@
-from telegram import Update
+import logging
+import math
+from dataclasses import dataclass
+from html import escape
+from typing import Optional
+from telegram import Update, InlineKeyboardMarkup, LinkPreviewOptions
+from telegram.error import BadRequest, TelegramError
 from telegram.ext import ContextTypes
-import hashlib
-from database import get_user, get_user_wishes
-from handlers.wishlist import send_wish_detail
-from keyboards import main_menu_keyboard
+from services.wishlist_service import wishlist_service
+from services.cache import LRUCache
+from services.shared_messages import SharedMessageStore
+from handlers.wishlist import render_wish_detail
+from keyboards import main_menu_keyboard, shared_page_keyboard
+from config import CACHE_MAX_ENTRIES, CACHE_TTL_SECONDS, SHARE_STORAGE_CHAT_ID
 
+logger = logging.getLogger(__name__)
 
-def generate_share_code(user_id: int) -> str:
-    """Generate a unique share code based on user_id"""
-    hash_object = hashlib.md5(str(user_id).encode())
-    return hash_object.hexdigest()[:8]
+# Wishes per page of a shared wishlist, and the description shown for each
+SHARED_PAGE_SIZE = 5
+DESCRIPTION_PREVIEW = 150
+
+NO_LINK_PREVIEW = LinkPreviewOptions(is_disabled=True)
+
+# With a storage chat, shared lists are sent as full wish messages copied
+# from it in bulk instead of the paged view
+shared_messages = (
+    SharedMessageStore(SHARE_STORAGE_CHAT_ID, render_wish_detail)
+    if SHARE_STORAGE_CHAT_ID
+    else None
+)
 
 
 async def share_wishlist(update: Update, context: ContextTypes.DEFAULT_TYPE):
-    """Share your wishlist via a link"""
+    """
+    Share your wishlist via a link
+    /share rotate replaces the link, /share revoke turns it off
+    """
     user_id = update.effective_user.id
-    user = get_user(user_id)
+    user = await wishlist_service.get_user(user_id)
     
     if not user:
         await update.message.reply_text("❌ Error: user not found")
         return
+
+    action = context.args[0].lower() if context.args else None
+
+    if action == 'revoke':
+        await wishlist_service.revoke_share_code(user_id)
+        await update.message.reply_text(
+            "🔒 <b>Your wishlist link is turned off</b>\n\n"
+            "The old link no longer works. Send /share to get a new one.",
+            parse_mode='HTML',
+            reply_markup=main_menu_keyboard()
+        )
+        return
     
-    wishes = get_user_wishes(user_id)
-    
-    if not wishes:
+    if not user.wish_count:
         await update.message.reply_text(
             "📝 <b>Your wishlist is empty</b>\n\n"
             "Add some wishes first before sharing!",
@@ -32,22 +63,24 @@ async def share_wishlist(update: Update, context: ContextTypes.DEFAULT_TYPE):
         )
         return
     
-    # Generate a unique share code
-    share_code = generate_share_code(user_id)
+    # A new code when asked for, or after the link was revoked
+    share_code = user.share_code
+    if action == 'rotate' or share_code is None:
+        share_code = await wishlist_service.rotate_share_code(user_id)
     
-    # Get bot username
-    bot_username = (await context.bot.get_me()).username
-    
-    # Build the share link
-    share_link = f"https://t.me/{bot_username}?start=view_{share_code}"
+    # Build the share link (the bot's username is known since startup)
+    share_link = f"https://t.me/{context.bot.username}?start=view_{share_code}"
     
     message = (
         f"🔗 <b>Your wishlist link</b>\n\n"
         f"Share this link with friends and family so they can see "
         f"what gifts you’d love to receive!\n\n"
-        f"📋 Total wishes: {len(wishes)}\n\n"
+        f"📋 Total wishes: {user.wish_count}\n"
+        f"👀 Link opened: {wishlist_service.share_views(user)} times\n\n"
         f"<code>{share_link}</code>\n\n"
-        f"Just copy and send this link!"
+        f"Just copy and send this link!\n\n"
+        f"/share rotate - replace the link\n"
+        f"/share revoke - turn the link off"
     )
     
     await update.message.reply_text(
@@ -57,69 +90,168 @@ async def share_wishlist(update: Update, context: ContextTypes.DEFAULT_TYPE):
     )
 
 
+def shared_view_error(snapshot) -> Optional[str]:
+    """Why a shared wishlist can't be shown (None if it can)"""
+    if not snapshot:
+        return "❌ Wishlist not found or link expired"
+    # Check if the wishlist is public
+    if not snapshot.owner.is_public:
+        return "🔒 This wishlist is private"
+    if not snapshot.wishes:
+        return f"📝 {snapshot.owner.first_name}'s wishlist is empty"
+    return None
+
+
+@dataclass(frozen=True, slots=True)
+class RenderedPage:
+    """Ready-to-send page of a shared wishlist"""
+    text: str
+    reply_markup: Optional[InlineKeyboardMarkup]
+    wish_ids: tuple[int, ...]
+
+
+# (owner_id, page) -> (snapshot, RenderedPage). Reused while the owner's
+# snapshot is the one it was rendered from, so all viewers share one render
+_shared_pages = LRUCache(max_entries=CACHE_MAX_ENTRIES, ttl=CACHE_TTL_SECONDS)
+
+
+def render_shared_page(snapshot, page: int) -> RenderedPage:
+    """Build (or reuse) one page of a shared wishlist as a single message"""
+    pages = max(1, math.ceil(len(snapshot.wishes) / SHARED_PAGE_SIZE))
+    page = min(max(page, 0), pages - 1)
+
+    key = (snapshot.owner.user_id, page)
+    cached = _shared_pages.get(key)
+    if cached is not None and cached[0] is snapshot:
+        return cached[1]
+
+    owner = snapshot.owner
+    message = (
+        f"🎁 <b>{escape(owner.first_name or '')}'s wishlist</b>\n"
+        f"📋 Total wishes: {len(snapshot.wishes)}"
+    )
+    if pages > 1:
+        message += f" · page {page + 1} of {pages}"
+    message += "\n"
+
+    first = page * SHARED_PAGE_SIZE
+    wishes = snapshot.wishes[first:first + SHARED_PAGE_SIZE]
+    for number, wish in enumerate(wishes, first + 1):
+        message += f"\n{number}. 📦 <b>{escape(wish.title)}</b>"
+        if wish.image_file_id:
+            message += " 📷"
+        message += "\n"
+        if wish.price:
+            message += f"💰 {escape(wish.price)}\n"
+        if wish.description:
+            description = wish.description
+            if len(description) > DESCRIPTION_PREVIEW:
+                description = description[:DESCRIPTION_PREVIEW].rstrip() + "…"
+            message += f"💭 {escape(description)}\n"
+        if wish.url:
+            # The address is not part of the text, so long links cost nothing
+            message += f'🔗 <a href="{escape(wish.url)}">Link</a>\n'
+
+    message += "\n💡 <b>Tip:</b> Save or note down what you plan to gift!"
+
+    rendered = RenderedPage(
+        text=message,
+        reply_markup=shared_page_keyboard(owner.share_code, page, pages),
+        wish_ids=tuple(wish.wish_id for wish in wishes),
+    )
+    _shared_pages.set(key, (snapshot, rendered))
+    return rendered
+
+
 async def view_shared_wishlist(update: Update, context: ContextTypes.DEFAULT_TYPE):
-    """View someone else's wishlist via shared link"""
+    """View someone else's wishlist via shared link (one message, paged with buttons)"""
     # Extract argument after /start
     if not context.args or not context.args[0].startswith('view_'):
         return
     
     share_code = context.args[0].replace('view_', '')
     
-    from database import get_db
-    from models import User
-    
-    db = get_db()
+    # Match share_code to user (served from a snapshot refreshed in the background)
+    snapshot = await wishlist_service.get_shared_snapshot(
+        share_code, viewer_id=update.effective_user.id
+    )
+
+    error = shared_view_error(snapshot)
+    if error:
+        await update.message.reply_text(error)
+        return
+
+    if shared_messages is not None and await send_stored_wishes(update, context, snapshot):
+        return
+
+    rendered = render_shared_page(snapshot, 0)
+    wishlist_service.count_shared_view(
+        snapshot.owner.user_id, update.effective_user.id, rendered.wish_ids, opened=True
+    )
+    await update.message.reply_text(
+        rendered.text,
+        parse_mode='HTML',
+        reply_markup=rendered.reply_markup,
+        link_preview_options=NO_LINK_PREVIEW,
+    )
+
+
+async def send_stored_wishes(update: Update, context: ContextTypes.DEFAULT_TYPE, snapshot) -> bool:
+    """
+    Send the whole list copied from the storage chat: one copyMessages call
+    per 100 wishes, then the summary. False if the storage chat failed
+    (the summary is not sent then: the fallback message has its own)
+    """
+    owner = snapshot.owner
     try:
-        users = db.query(User).all()
-        target_user = None
-        
-        # Match share_code to user
-        for user in users:
-            if generate_share_code(user.user_id) == share_code:
-                target_user = user
-                break
-        
-        if not target_user:
-            await update.message.reply_text(
-                "❌ Wishlist not found or link expired"
-            )
-            return
-        
-        # Check if the wishlist is public
-        if not target_user.is_public:
-            await update.message.reply_text(
-                "🔒 This wishlist is private"
-            )
-            return
-        
-        # Get wishes
-        wishes = get_user_wishes(target_user.user_id)
-        
-        if not wishes:
-            await update.message.reply_text(
-                f"📝 {target_user.first_name}'s wishlist is empty"
-            )
-            return
-        
-        # Show the wishlist
-        viewer_name = update.effective_user.first_name
-        
-        await update.message.reply_text(
-            f"👋 Hi, {viewer_name}!\n\n"
-            f"🎁 <b>{target_user.first_name}'s wishlist</b>\n"
-            f"📋 Total wishes: {len(wishes)}\n\n"
-            f"Here’s what they’d like to receive:",
-            parse_mode='HTML'
-        )
-        
-        # Send each wish (without edit/delete buttons)
-        for wish in wishes:
-            await send_wish_detail(update, wish, show_actions=False)
-        
-        await update.message.reply_text(
-            "💡 <b>Tip:</b> Save or note down what you plan to gift!",
-            parse_mode='HTML'
+        await shared_messages.deliver(context.bot, update.effective_chat.id, snapshot)
+    except TelegramError as e:
+        logger.error(f"Failed to send the shared wishlist of {owner.user_id} from storage: {e}")
+        return False
+
+    await update.message.reply_text(
+        f"🎁 <b>{escape(owner.first_name or '')}'s wishlist</b>\n"
+        f"📋 Total wishes: {len(snapshot.wishes)}",
+        parse_mode='HTML'
+    )
+
+    wishlist_service.count_shared_view(
+        owner.user_id,
+        update.effective_user.id,
+        (wish.wish_id for wish in snapshot.wishes),
+        opened=True
+    )
+    return True
+
+
+async def shared_page_callback(update: Update, context: ContextTypes.DEFAULT_TYPE):
+    """Handling the ◀/▶ buttons of a shared wishlist (edits the message in place)"""
+    query = update.callback_query
+    # shared_{share_code}_{page}: the code itself may contain "_"
+    share_code, _, page = query.data[len('shared_'):].rpartition('_')
+
+    snapshot = await wishlist_service.get_shared_snapshot(
+        share_code, viewer_id=query.from_user.id
+    )
+    await query.answer()
+
+    error = shared_view_error(snapshot)
+    if error:
+        await query.edit_message_text(error)
+        return
+
+    rendered = render_shared_page(snapshot, int(page))
+    wishlist_service.count_shared_view(
+        snapshot.owner.user_id, query.from_user.id, rendered.wish_ids
+    )
+    try:
+        await query.edit_message_text(
+            rendered.text,
+            parse_mode='HTML',
+            reply_markup=rendered.reply_markup,
+            link_preview_options=NO_LINK_PREVIEW,
         )
-    
-    finally:
-        db.close()
+    except BadRequest as e:
+        # A button of an outdated page led to the page already shown
+        if "not modified" not in str(e).lower():
+            raise
@@ -1,18 +1,12 @@
 from telegram import Update
 from telegram.ext import ContextTypes
 from keyboards import main_menu_keyboard
-from database import get_or_create_user
 
 async def start_command(update: Update, context: ContextTypes.DEFAULT_TYPE):
     """Handler for the /start command"""
     user = update.effective_user
 
-    # Get or create the user in the database
-    db_user = get_or_create_user(
-        user_id=user.id,
-        username=user.username,
-        first_name=user.first_name
-    )
+    # The user row is created/refreshed for every update in bot.py
     
     welcome_message = f"""
     👋 Hi, {user.first_name}!
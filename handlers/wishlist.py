@@ -1,6 +1,10 @@
 import os
+from dataclasses import dataclass
+from datetime import datetime
 from pathlib import Path
+from typing import Optional
 from telegram import Update, InputMediaPhoto, InlineKeyboardButton, InlineKeyboardMarkup
+from telegram.error import BadRequest
 from telegram.ext import (
     ContextTypes,
     ConversationHandler,
@@ -11,6 +15,7 @@ from keyboards import (
     cancel_keyboard,
     wish_actions_keyboard,
     confirm_delete_keyboard,
+    more_wishes_keyboard,
     MY_WISHLIST_BUTTON,
     ADD_WISH_BUTTON,
     SHARE_BUTTON,
@@ -19,6 +24,9 @@ from keyboards import (
     SKIP_BUTTON,
 )
 from services.wishlist_service import wishlist_service  
+from services.cache import LRUCache
+from services.telegram_files import telegram_files
+from config import CACHE_MAX_ENTRIES, CACHE_TTL_SECONDS
 
 # States
 TITLE, DESCRIPTION, URL, PRICE, IMAGE = range(5)
@@ -34,7 +42,7 @@ async def add_wish_start(update: Update, context: ContextTypes.DEFAULT_TYPE):
     user_id = update.effective_user.id
 
     # check via service whether the user can add more wishes
-    if not wishlist_service.can_add_wish(user_id):
+    if not await wishlist_service.can_add_wish(user_id):
         await update.message.reply_text(
             f"❌ You've reached the limit of {wishlist_service.MAX_WISHES_PER_USER} wishes!",
             parse_mode="HTML",
@@ -183,7 +191,7 @@ async def wish_image(update: Update, context: ContextTypes.DEFAULT_TYPE):
 
     # Save the wish to db
     user_id = update.effective_user.id
-    wish, error = wishlist_service.add_wish(
+    wish, error = await wishlist_service.add_wish(
         user_id=user_id,
         title=context.user_data["wish_title"],
         description=context.user_data.get("wish_description"),
@@ -247,11 +255,11 @@ async def cancel_add_wish(update: Update, context: ContextTypes.DEFAULT_TYPE):
 
 
 async def my_wishlist(update: Update, context: ContextTypes.DEFAULT_TYPE):
-    """Show my whishlist"""
+    """Show my whishlist (one page at a time)"""
     user_id = update.effective_user.id
-    wishes = wishlist_service.get_user_wishes(user_id)
+    user = await wishlist_service.get_user(user_id)
 
-    if not wishes:
+    if not user or not user.wish_count:
         await update.message.reply_text(
             "📝 <b>Your wishlist is empty</b>\n\n"
             "Add your first wish by clicking <b>➕ Add wish</b>",
@@ -262,17 +270,67 @@ async def my_wishlist(update: Update, context: ContextTypes.DEFAULT_TYPE):
 
     await update.message.reply_text(
         f"📝 <b>Your wishlist</b>\n"
-        f"Total wishes: {len(wishes)}\n\n"
+        f"Total wishes: {user.wish_count}\n\n"
         f"Here are your wishes:",
         parse_mode="HTML",
     )
+    await send_wishes_page(update, user_id)
+
+
+async def my_wishlist_more_callback(update: Update, context: ContextTypes.DEFAULT_TYPE):
+    """Handling the "Show more" button under a page of my wishlist"""
+    query = update.callback_query
+    await query.answer()
+
+    # my_wishes_{created_at}_{wish_id}: the cursor of the next page
+    created_at, _, wish_id = query.data[len("my_wishes_"):].rpartition("_")
+    try:
+        await query.edit_message_reply_markup(reply_markup=None)
+    except BadRequest as e:
+        # A second tap: the first one removed the button and sent the page
+        if "not modified" not in str(e).lower():
+            raise
+        return
+    await send_wishes_page(
+        update, update.effective_user.id, (datetime.fromisoformat(created_at), int(wish_id))
+    )
+
+
+async def send_wishes_page(update: Update, user_id: int, after: Optional[tuple[datetime, int]] = None):
+    """Send one page of the user's wishes, with a button for the next one"""
+    wishes, cursor = await wishlist_service.get_wishes_page(user_id, after=after)
 
     for wish in wishes:
         await send_wish_detail(update, wish, show_actions=True)
 
+    if cursor is not None:
+        await update.effective_message.reply_text(
+            "There are more wishes in your list",
+            reply_markup=more_wishes_keyboard(cursor),
+        )
+
+
+@dataclass(frozen=True, slots=True)
+class RenderedWish:
+    """Ready-to-send wish message"""
+    text: str
+    parse_mode: str
+    reply_markup: Optional[InlineKeyboardMarkup]
+    photo: Optional[str]
+
+
+# (wish_id, updated_at, show_actions) -> RenderedWish. Every change of a wish
+# moves updated_at, so edited wishes get a new key and old renders age out
+_rendered_wishes = LRUCache(max_entries=CACHE_MAX_ENTRIES, ttl=CACHE_TTL_SECONDS)
+
+
+def render_wish_detail(wish, show_actions: bool = False) -> RenderedWish:
+    """Build (or reuse) the message showing one wish"""
+    key = (wish.wish_id, wish.updated_at, show_actions)
+    rendered = _rendered_wishes.get(key)
+    if rendered is not None:
+        return rendered
 
-async def send_wish_detail(update: Update, wish, show_actions: bool = False):
-    """Send details of one wish"""
     message = f"📦 <b>{wish.title}</b>\n"
     message += f"🆔 ID: {wish.wish_id}\n\n"
 
@@ -285,18 +343,32 @@ async def send_wish_detail(update: Update, wish, show_actions: bool = False):
 
     message += f"\n📅 Added: {wish.created_at.strftime('%d.%m.%Y %H:%M')}"
 
-    keyboard = wish_actions_keyboard(wish.wish_id) if show_actions else None
+    rendered = RenderedWish(
+        text=message,
+        parse_mode="HTML",
+        reply_markup=wish_actions_keyboard(wish.wish_id) if show_actions else None,
+        photo=wish.image_file_id,
+    )
+    _rendered_wishes.set(key, rendered)
+    return rendered
 
-    if wish.image_file_id:
-        await update.message.reply_photo(
-            photo=wish.image_file_id,
-            caption=message,
-            parse_mode="HTML",
-            reply_markup=keyboard,
+
+async def send_wish_detail(update: Update, wish, show_actions: bool = False):
+    """Send details of one wish"""
+    rendered = render_wish_detail(wish, show_actions)
+
+    if rendered.photo:
+        await update.effective_message.reply_photo(
+            photo=rendered.photo,
+            caption=rendered.text,
+            parse_mode=rendered.parse_mode,
+            reply_markup=rendered.reply_markup,
         )
     else:
-        await update.message.reply_text(
-            message, parse_mode="HTML", reply_markup=keyboard
+        await update.effective_message.reply_text(
+            rendered.text,
+            parse_mode=rendered.parse_mode,
+            reply_markup=rendered.reply_markup,
         )
 
 
@@ -311,7 +383,7 @@ async def delete_wish_callback(update: Update, context: ContextTypes.DEFAULT_TYP
     wish_id = int(query.data.split("_")[1])
     user_id = update.effective_user.id
 
-    wish = wishlist_service.get_wish(wish_id, user_id)
+    wish = await wishlist_service.get_wish(wish_id, user_id)
 
     if not wish:
         text = "❌ Wish not found or access denied"
@@ -348,7 +420,7 @@ async def confirm_delete_callback(update: Update, context: ContextTypes.DEFAULT_
     wish_id = int(query.data.split("_")[2])
     user_id = update.effective_user.id
 
-    success, error = wishlist_service.delete_wish(wish_id, user_id)
+    success, error = await wishlist_service.delete_wish(wish_id, user_id)
     message = query.message
 
     if success:
@@ -391,7 +463,7 @@ async def edit_wish_callback(update: Update, context: ContextTypes.DEFAULT_TYPE)
     wish_id = int(query.data.split("_")[1])
     user_id = update.effective_user.id
 
-    wish = wishlist_service.get_wish(wish_id, user_id)
+    wish = await wishlist_service.get_wish(wish_id, user_id)
 
 
     if not wish:
@@ -458,7 +530,7 @@ async def edit_field_choice_callback(
 
     context.user_data["editing_wish_id"] = wish_id
 
-    wish = wishlist_service.get_wish(wish_id, user_id)
+    wish = await wishlist_service.get_wish(wish_id, user_id)
     if not wish:
         await query.edit_message_text("❌ Wish not found")
         return ConversationHandler.END
@@ -514,7 +586,7 @@ async def edit_title_handler(update: Update, context: ContextTypes.DEFAULT_TYPE)
     new_title = update.message.text.strip()
     user_id = update.effective_user.id
 
-    updated_wish, error = wishlist_service.update_wish(
+    updated_wish, error = await wishlist_service.update_wish(
         wish_id,
         user_id,
         title=new_title
@@ -544,7 +616,7 @@ async def edit_description_handler(update: Update, context: ContextTypes.DEFAULT
     new_description = update.message.text.strip()
     user_id = update.effective_user.id
 
-    updated_wish, error = wishlist_service.update_wish(
+    updated_wish, error = await wishlist_service.update_wish(
         wish_id, 
         user_id, 
         description=new_description
@@ -570,7 +642,7 @@ async def edit_url_handler(update: Update, context: ContextTypes.DEFAULT_TYPE):
     new_url = update.message.text.strip()
     user_id = update.effective_user.id
 
-    updated_wish, error = wishlist_service.update_wish(
+    updated_wish, error = await wishlist_service.update_wish(
         wish_id, 
         user_id, 
         url=new_url
@@ -596,7 +668,7 @@ async def edit_price_handler(update: Update, context: ContextTypes.DEFAULT_TYPE)
     new_price = update.message.text.strip()
     user_id = update.effective_user.id
 
-    updated_wish, error = wishlist_service.update_wish(
+    updated_wish, error = await wishlist_service.update_wish(
         wish_id, 
         user_id, 
         price=new_price
@@ -626,11 +698,14 @@ async def edit_image_handler(update: Update, context: ContextTypes.DEFAULT_TYPE)
             images_dir = Path("images")
             images_dir.mkdir(exist_ok=True)
 
-            photo_file = await update.message.photo[-1].get_file()
+            photo = update.message.photo[-1]
+            photo_file = await telegram_files.get_file(
+                context.bot, photo.file_id, photo.file_unique_id
+            )
             image_path = images_dir/f"{user_id}_{wish_id}.jpg"
             await photo_file.download_to_drive(image_path)
 
-            updated_wish, error = wishlist_service.update_wish(
+            updated_wish, error = await wishlist_service.update_wish(
                 wish_id, 
                 user_id, 
                 image_path=str(image_path)
@@ -655,7 +730,7 @@ async def edit_image_handler(update: Update, context: ContextTypes.DEFAULT_TYPE)
     else:
         text = update.message.text.strip()
         if text.lower() == "skip":
-            updated_wish, error = wishlist_service.update_wish(
+            updated_wish, error = await wishlist_service.update_wish(
                 wish_id, 
                 user_id, 
                 image_path=None
@@ -1,3 +1,4 @@
+from datetime import datetime
 from telegram import ReplyKeyboardMarkup, InlineKeyboardMarkup, InlineKeyboardButton, KeyboardButton
 
 # ===== BUTTON TEXT CONSTANTS =====
@@ -13,6 +14,10 @@ EDIT_BUTTON = "✏️ Edit"
 DELETE_BUTTON = "🗑 Delete"
 CONFIRM_DELETE_BUTTON = "✅ Yes, delete"
 
+PREVIOUS_PAGE_BUTTON = "◀️"
+NEXT_PAGE_BUTTON = "▶️"
+MORE_WISHES_BUTTON = "⏬ Show more"
+
 # ===== REPLY KEYBOARDS =====
 def main_menu_keyboard():
     """Main menu keyboard"""
@@ -55,3 +60,22 @@ def confirm_delete_keyboard(wish_id: int):
         ]
     ]
     return InlineKeyboardMarkup(keyboard)
+
+def more_wishes_keyboard(cursor: tuple[datetime, int]):
+    """Inline keyboard loading the next page of my wishlist (after cursor)"""
+    created_at, wish_id = cursor
+    keyboard = [
+        [InlineKeyboardButton(MORE_WISHES_BUTTON, callback_data=f"my_wishes_{created_at.isoformat()}_{wish_id}")]
+    ]
+    return InlineKeyboardMarkup(keyboard)
+
+def shared_page_keyboard(share_code: str, page: int, pages: int):
+    """Inline keyboard for paging through a shared wishlist (None for a single page)"""
+    if pages <= 1:
+        return None
+    row = []
+    if page > 0:
+        row.append(InlineKeyboardButton(PREVIOUS_PAGE_BUTTON, callback_data=f"shared_{share_code}_{page - 1}"))
+    if page < pages - 1:
+        row.append(InlineKeyboardButton(NEXT_PAGE_BUTTON, callback_data=f"shared_{share_code}_{page + 1}"))
+    return InlineKeyboardMarkup([row])
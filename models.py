@@ -1,7 +1,9 @@
 from sqlalchemy import Column, Integer, String, Float, Boolean, DateTime, ForeignKey, Text, Index
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import relationship
+from dataclasses import dataclass
 from datetime import datetime
+from typing import Optional
 
 Base = declarative_base()
 
@@ -13,6 +15,11 @@ class User(Base):
     username = Column(String(255), nullable=True)
     first_name = Column(String(255), nullable=True)
     is_public = Column(Boolean, default=True)  # Public or private wishlist 
+    wish_count = Column(Integer, nullable=False, default=0, server_default='0')  # Kept in sync by add/delete
+    list_version = Column(Integer, nullable=False, default=0, server_default='0')  # Bumped by every wish write
+    share_code = Column(String(16), nullable=True)  # Code of the share link (None: sharing revoked)
+    share_code_changed_at = Column(DateTime, nullable=True, default=datetime.utcnow)
+    share_views = Column(Integer, nullable=False, default=0, server_default='0')  # Opens of the share link
     created_at = Column(DateTime, default=datetime.utcnow)
 
     wishes = relationship('Wish', back_populates='user', cascade='all, delete-orphan')
@@ -20,6 +27,8 @@ class User(Base):
     # Index for searching by username
     __table_args__ = (
          Index('idx_users_username', 'username'),
+         Index('idx_users_share_code', 'share_code', unique=True),  # Resolving share links
+         Index('idx_users_share_code_changed', 'share_code_changed_at'),
    ) 
     def __repr__(self):
                 return f"<User(user_id={self.user_id}, username={self.username})>"
@@ -36,6 +45,7 @@ class Wish(Base):
     url = Column(String(500), nullable=True)
     price = Column(String(100), nullable=True)  # Save as text for flexibility 
     image_file_id = Column(String(255), nullable=True)  # file_id from Telegram
+    view_count = Column(Integer, nullable=False, default=0, server_default='0')  # Shown in shared views
     created_at = Column(DateTime, default=datetime.utcnow)
     updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
     
@@ -48,4 +58,152 @@ class Wish(Base):
     )
     
     def __repr__(self):
-        return f"<Wish(wish_id={self.wish_id}, title={self.title}, user_id={self.user_id})>"
\ No newline at end of file
+        return f"<Wish(wish_id={self.wish_id}, title={self.title}, user_id={self.user_id})>"
+
+
+class CacheInvalidation(Base):
+    """Changelog of users whose cached wishlist changed (polled by every worker)"""
+    __tablename__ = 'cache_invalidations'
+
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    user_id = Column(Integer, nullable=False)
+    list_version = Column(Integer, nullable=True)  # The user's list version after the write
+    created_at = Column(DateTime, nullable=False, default=datetime.utcnow)
+
+    __table_args__ = (
+        Index('idx_cache_invalidations_created', 'created_at'),
+    )
+
+
+class TelegramFile(Base):
+    """Bot API getFile result, reused while Telegram keeps the download link valid"""
+    __tablename__ = 'telegram_files'
+
+    file_unique_id = Column(String(64), primary_key=True)
+    file_id = Column(String(255), nullable=False)
+    file_path = Column(String(255), nullable=True)  # Without the bot's file URL (it contains the token)
+    file_size = Column(Integer, nullable=True)
+    fetched_at = Column(DateTime, nullable=False, default=datetime.utcnow)
+
+    __table_args__ = (
+        Index('idx_telegram_files_file_id', 'file_id'),
+    )
+
+
+class SharedMessage(Base):
+    """Copy of a shared wish in the storage chat (see SHARE_STORAGE_CHAT_ID)"""
+    __tablename__ = 'shared_messages'
+
+    wish_id = Column(Integer, primary_key=True)  # No foreign key: delete_wish removes the row
+    owner_id = Column(Integer, nullable=False)
+    message_id = Column(Integer, nullable=False)
+    wish_updated_at = Column(DateTime, nullable=True)  # The wish's updated_at when it was copied
+
+    __table_args__ = (
+        Index('idx_shared_messages_owner', 'owner_id'),
+    )
+
+
+# ===== Read models =====
+# Plain immutable records returned by the read paths of database.py.
+# Unlike ORM instances they carry no session state, so they are cheap to
+# cache, safe to share between tasks and never trigger lazy loads.
+
+
+@dataclass(frozen=True, slots=True)
+class UserView:
+    """Read-only user record"""
+    user_id: int
+    username: Optional[str]
+    first_name: Optional[str]
+    is_public: bool
+    wish_count: int
+    list_version: int
+    share_code: Optional[str]
+    share_views: int
+    created_at: Optional[datetime]
+
+    @classmethod
+    def from_model(cls, user: User) -> 'UserView':
+        return cls(
+            user_id=user.user_id,
+            username=user.username,
+            first_name=user.first_name,
+            is_public=user.is_public,
+            wish_count=user.wish_count,
+            list_version=user.list_version,
+            share_code=user.share_code,
+            share_views=user.share_views,
+            created_at=user.created_at,
+        )
+
+
+@dataclass(frozen=True, slots=True)
+class WishView:
+    """Read-only wish record"""
+    wish_id: int
+    user_id: int
+    title: str
+    description: Optional[str]
+    url: Optional[str]
+    price: Optional[str]
+    image_file_id: Optional[str]
+    created_at: Optional[datetime]
+    updated_at: Optional[datetime]
+
+    @classmethod
+    def from_model(cls, wish: Wish) -> 'WishView':
+        return cls(
+            wish_id=wish.wish_id,
+            user_id=wish.user_id,
+            title=wish.title,
+            description=wish.description,
+            url=wish.url,
+            price=wish.price,
+            image_file_id=wish.image_file_id,
+            created_at=wish.created_at,
+            updated_at=wish.updated_at,
+        )
+
+    def to_dict(self) -> dict:
+        """JSON-friendly form (for caches shared between processes)"""
+        return {
+            'wish_id': self.wish_id,
+            'user_id': self.user_id,
+            'title': self.title,
+            'description': self.description,
+            'url': self.url,
+            'price': self.price,
+            'image_file_id': self.image_file_id,
+            'created_at': self.created_at.isoformat() if self.created_at else None,
+            'updated_at': self.updated_at.isoformat() if self.updated_at else None,
+        }
+
+    @classmethod
+    def from_dict(cls, data: dict) -> 'WishView':
+        created_at, updated_at = data['created_at'], data['updated_at']
+        return cls(**{
+            **data,
+            'created_at': datetime.fromisoformat(created_at) if created_at else None,
+            'updated_at': datetime.fromisoformat(updated_at) if updated_at else None,
+        })
+
+
+@dataclass(frozen=True, slots=True)
+class TelegramFileView:
+    """Read-only getFile result"""
+    file_unique_id: str
+    file_id: str
+    file_path: Optional[str]
+    file_size: Optional[int]
+    fetched_at: datetime
+
+    @classmethod
+    def from_model(cls, telegram_file: TelegramFile) -> 'TelegramFileView':
+        return cls(
+            file_unique_id=telegram_file.file_unique_id,
+            file_id=telegram_file.file_id,
+            file_path=telegram_file.file_path,
+            file_size=telegram_file.file_size,
+            fetched_at=telegram_file.fetched_at,
+        )
@@ -0,0 +1,67 @@
+import logging
+import os
+from array import array
+from collections import OrderedDict
+from typing import List
+
+logger = logging.getLogger(__name__)
+
+
+class RecentUsers:
+    """
+    The most recently active user ids, persisted across restarts.
+
+    Kept in memory in recency order (at most `max_users`) and saved to
+    `path` as packed 64-bit integers, oldest first - 8 bytes per user.
+    """
+
+    def __init__(self, path: str, max_users: int = 1000):
+        self.path = path
+        self.max_users = max_users
+        self._users: "OrderedDict[int, None]" = OrderedDict()
+
+    def record(self, user_id: int):
+        self._users[user_id] = None
+        self._users.move_to_end(user_id)
+        if len(self._users) > self.max_users:
+            self._users.popitem(last=False)
+
+    def most_recent(self) -> List[int]:
+        """User ids, most recently active first"""
+        return list(reversed(self._users))
+
+    def load(self):
+        """Read the ids saved by the previous run (missing file = none)"""
+        ids = array("q")
+        try:
+            with open(self.path, "rb") as f:
+                ids.frombytes(f.read())
+        except FileNotFoundError:
+            return
+        except (OSError, ValueError) as e:
+            logger.warning(f"Could not read {self.path}: {e}")
+            return
+
+        # Newest first to the front: users active in this run so far stay
+        # the most recent, saved ones keep their order behind them
+        for user_id in reversed(ids[-self.max_users:]):
+            if user_id not in self._users:
+                self._users[user_id] = None
+                self._users.move_to_end(user_id, last=False)
+        while len(self._users) > self.max_users:
+            self._users.popitem(last=False)
+
+    def save(self):
+        """Write the ids atomically (a crash never leaves half a file)"""
+        if not self._users:
+            return
+        temp_path = f"{self.path}.tmp"
+        try:
+            with open(temp_path, "wb") as f:
+                array("q", self._users).tofile(f)
+            os.replace(temp_path, self.path)
+        except OSError as e:
+            logger.warning(f"Could not save {self.path}: {e}")
+
+    def __len__(self) -> int:
+        return len(self._users)
@@ -0,0 +1,151 @@
+import sys
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any, Callable, Hashable, Optional
+
+
+@dataclass(frozen=True)
+class CacheStats:
+    """Snapshot of cache counters"""
+    hits: int
+    misses: int
+    evictions: int
+    expirations: int
+    entries: int
+    size_bytes: int
+
+    @property
+    def hit_rate(self) -> float:
+        total = self.hits + self.misses
+        return self.hits / total if total else 0.0
+
+
+def estimate_size(value: Any) -> int:
+    """Approximate memory footprint of a cached value in bytes"""
+    size = sys.getsizeof(value)
+    if isinstance(value, (list, tuple, set, frozenset)):
+        size += sum(estimate_size(item) for item in value)
+    elif isinstance(value, dict):
+        size += sum(estimate_size(k) + estimate_size(v) for k, v in value.items())
+    elif hasattr(value, "__slots__"):
+        size += sum(
+            estimate_size(getattr(value, name, None)) for name in value.__slots__
+        )
+    return size
+
+
+class _Entry:
+    __slots__ = ("value", "expires_at", "size")
+
+    def __init__(self, value: Any, expires_at: Optional[float], size: int):
+        self.value = value
+        self.expires_at = expires_at
+        self.size = size
+
+
+class LRUCache:
+    """
+    Bounded in-process cache.
+
+    Evicts the least recently used entries once `max_entries` or the
+    approximate `max_bytes` is exceeded; entries also expire after `ttl`
+    seconds (per-entry override in set()). Hit, miss, eviction and
+    expiration counters are available through stats().
+    """
+
+    def __init__(
+        self,
+        max_entries: int = 1024,
+        max_bytes: Optional[int] = None,
+        ttl: Optional[float] = None,
+        sizeof: Callable[[Any], int] = estimate_size,
+    ):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self.sizeof = sizeof
+        self._entries: "OrderedDict[Hashable, _Entry]" = OrderedDict()
+        self._size = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        """Get a value and mark it as recently used"""
+        entry = self._entries.get(key)
+        if entry is None:
+            self.misses += 1
+            return default
+
+        if entry.expires_at is not None and entry.expires_at <= time.monotonic():
+            self._remove(key)
+            self.expirations += 1
+            self.misses += 1
+            return default
+
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return entry.value
+
+    def set(self, key: Hashable, value: Any, ttl: Optional[float] = None):
+        """Store a value (ttl overrides the cache default for this entry)"""
+        ttl = self.ttl if ttl is None else ttl
+        expires_at = time.monotonic() + ttl if ttl else None
+        size = self.sizeof(value) if self.max_bytes else 0
+
+        if key in self._entries:
+            self._remove(key)
+        self._entries[key] = _Entry(value, expires_at, size)
+        self._size += size
+        self._evict()
+
+    def peek(self, key: Hashable, default: Any = None) -> Any:
+        """Get a value without marking it as used or counting a hit/miss"""
+        if key not in self:
+            return default
+        return self._entries[key].value
+
+    def pop(self, key: Hashable, default: Any = None) -> Any:
+        """Remove a value, returning it (or default) - does not count as a hit"""
+        entry = self._entries.get(key)
+        if entry is None:
+            return default
+        self._remove(key)
+        return entry.value
+
+    def clear(self):
+        self._entries.clear()
+        self._size = 0
+
+    def stats(self) -> CacheStats:
+        return CacheStats(
+            hits=self.hits,
+            misses=self.misses,
+            evictions=self.evictions,
+            expirations=self.expirations,
+            entries=len(self._entries),
+            size_bytes=self._size,
+        )
+
+    def __contains__(self, key: Hashable) -> bool:
+        entry = self._entries.get(key)
+        return entry is not None and (
+            entry.expires_at is None or entry.expires_at > time.monotonic()
+        )
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def _remove(self, key: Hashable):
+        entry = self._entries.pop(key)
+        self._size -= entry.size
+
+    def _evict(self):
+        while len(self._entries) > self.max_entries or (
+            self.max_bytes and self._size > self.max_bytes and len(self._entries) > 1
+        ):
+            _, entry = self._entries.popitem(last=False)
+            self._size -= entry.size
+            self.evictions += 1
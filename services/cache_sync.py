@@ -0,0 +1,185 @@
+import asyncio
+import json
+import logging
+from datetime import datetime, timedelta
+from typing import Callable, Dict, List, Optional, Tuple
+
+try:
+    import redis.asyncio as redis
+except ImportError:  # optional, only needed with REDIS_URL
+    redis = None
+
+from database import get_cache_invalidations, prune_cache_invalidations
+from models import WishView
+
+logger = logging.getLogger(__name__)
+
+# Applies {user_id: new list version} to the local cache (None: version unknown)
+Invalidate = Callable[[Dict[int, Optional[int]]], None]
+
+
+class ChangelogPoller:
+    """
+    Cache invalidation channel through the database.
+
+    Every write records its user and their new list version in the
+    cache_invalidations table within its own transaction; each worker polls
+    the table and applies those versions to its local cache. Rows are
+    matched by time with a `grace` period (ids are not committed in order
+    on PostgreSQL and worker clocks drift), and rows older than `retention`
+    are pruned now and then.
+    """
+
+    def __init__(
+        self,
+        invalidate: Invalidate,
+        interval: float = 1.0,
+        grace: float = 10.0,
+        retention: float = 600.0,
+    ):
+        self.invalidate = invalidate
+        self.interval = interval
+        self.grace = timedelta(seconds=grace)
+        self.retention = timedelta(seconds=retention)
+        self._since = datetime.utcnow()
+        self._seen: set = set()
+        self._pruned_at = datetime.utcnow()
+        self._task: Optional[asyncio.Task] = None
+
+    async def start(self):
+        self._since = datetime.utcnow()
+        self._task = asyncio.create_task(self._run(), name="cache-changelog")
+        logger.info("🔄 Polling cache invalidations every %ss", self.interval)
+
+    async def stop(self):
+        if self._task is None:
+            return
+        self._task.cancel()
+        await asyncio.gather(self._task, return_exceptions=True)
+        self._task = None
+
+    async def poll(self):
+        """Apply the invalidations recorded since the previous poll"""
+        started = datetime.utcnow()
+        rows = await get_cache_invalidations(self._since - self.grace)
+        fresh: Dict[int, Optional[int]] = {}
+        for row_id, user_id, list_version in rows:
+            if row_id in self._seen:
+                continue
+            if user_id in fresh and list_version is not None:
+                previous = fresh[user_id]
+                list_version = None if previous is None else max(previous, list_version)
+            fresh[user_id] = list_version
+        # The next window starts later, so ids outside it never come back
+        self._seen = {row_id for row_id, _, _ in rows}
+        self._since = started
+        if fresh:
+            self.invalidate(fresh)
+
+        if started - self._pruned_at >= timedelta(seconds=60):
+            self._pruned_at = started
+            await prune_cache_invalidations(started - self.retention)
+
+    async def _run(self):
+        while True:
+            await asyncio.sleep(self.interval)
+            try:
+                await self.poll()
+            except Exception as e:
+                logger.error(f"Failed to poll cache invalidations: {e}")
+
+
+class RedisCache:
+    """
+    Shared second-level wishlist cache with pub/sub invalidation.
+
+    Every user has a version counter that is bumped after each committed
+    write. A cached list stores the version it was read at and is ignored
+    once the counter moved on, so a slow reader can never put an older list
+    back after a write. Redis errors are logged and treated as cache misses.
+    """
+
+    CHANNEL = "wishlist:invalidate"
+
+    def __init__(self, url: str, invalidate: Invalidate, reset: Callable[[], None], ttl: float = 600):
+        if redis is None:
+            raise RuntimeError("REDIS_URL is set but the redis package is not installed")
+        self.client = redis.from_url(url)
+        self.invalidate_local = invalidate
+        self.reset_local = reset
+        self.ttl = int(ttl) or None
+        self._task: Optional[asyncio.Task] = None
+
+    @staticmethod
+    def _keys(user_id: int) -> Tuple[str, str]:
+        return f"wishlist:{user_id}:version", f"wishlist:{user_id}"
+
+    async def start(self):
+        self._task = asyncio.create_task(self._listen(), name="cache-redis")
+        logger.info("🔄 Shared wishlist cache in Redis")
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+        await self.client.aclose()
+
+    async def get_wishlist(self, user_id: int) -> Tuple[Optional[List[WishView]], Optional[int]]:
+        """
+        Returns: (cached wishes or None, current version)
+        The version is None when Redis is unavailable
+        """
+        version_key, list_key = self._keys(user_id)
+        try:
+            version, data = await self.client.mget(version_key, list_key)
+        except redis.RedisError as e:
+            logger.warning(f"Redis read failed: {e}")
+            return None, None
+
+        version = int(version or 0)
+        if data:
+            cached = json.loads(data)
+            if cached["version"] == version:
+                return [WishView.from_dict(item) for item in cached["wishes"]], version
+        return None, version
+
+    async def set_wishlist(self, user_id: int, version: int, wishes: List[WishView]):
+        """Store wishes read at the given version"""
+        _, list_key = self._keys(user_id)
+        data = json.dumps({"version": version, "wishes": [w.to_dict() for w in wishes]})
+        try:
+            await self.client.set(list_key, data, ex=self.ttl)
+        except redis.RedisError as e:
+            logger.warning(f"Redis write failed: {e}")
+
+    async def invalidate(self, user_id: int, list_version: Optional[int]):
+        """Bump the user's version and tell every worker about the new list version"""
+        version_key, _ = self._keys(user_id)
+        try:
+            async with self.client.pipeline(transaction=False) as pipe:
+                pipe.incr(version_key)
+                if self.ttl:
+                    # Outlives every list cached at an older version
+                    pipe.expire(version_key, 2 * self.ttl)
+                pipe.publish(self.CHANNEL, f"{user_id}:{'' if list_version is None else list_version}")
+                await pipe.execute()
+        except redis.RedisError as e:
+            logger.warning(f"Redis invalidation failed: {e}")
+
+    async def _listen(self):
+        while True:
+            try:
+                async with self.client.pubsub() as pubsub:
+                    await pubsub.subscribe(self.CHANNEL)
+                    # Messages published while disconnected are lost
+                    self.reset_local()
+                    async for message in pubsub.listen():
+                        if message["type"] == "message":
+                            user_id, list_version = message["data"].split(b":")
+                            self.invalidate_local(
+                                {int(user_id): int(list_version) if list_version else None}
+                            )
+            except redis.RedisError as e:
+                logger.warning(f"Redis invalidation channel lost: {e}")
+                await asyncio.sleep(1)
@@ -0,0 +1,118 @@
+import logging
+from datetime import datetime
+from typing import Callable, Dict, List, Optional, Tuple
+
+from telegram import Bot, Message
+from telegram.error import TelegramError
+
+from config import CACHE_MAX_ENTRIES, CACHE_TTL_SECONDS
+from database import get_shared_messages, save_shared_messages
+from models import WishView
+from services.cache import LRUCache
+from services.singleflight import SingleFlight
+
+logger = logging.getLogger(__name__)
+
+
+class SharedMessageStore:
+    """
+    Shared wishlists delivered with copyMessages from a storage chat.
+
+    Each wish of a shared list is posted once to a private chat and its
+    message id is kept in the shared_messages table with the wish's
+    updated_at; only new or edited wishes are posted again. Viewers get the
+    list as copies, up to 100 per copyMessages call. Copies keep the order
+    of the message ids, so wishes are stored oldest first and an edited
+    wish moves to the end.
+    """
+
+    BATCH_SIZE = 100  # copyMessages / deleteMessages limit
+
+    def __init__(self, chat_id: int, render: Callable[[WishView], object]):
+        self.chat_id = chat_id
+        # Wish -> RenderedWish (see handlers/wishlist.py)
+        self.render = render
+        # owner_id -> (snapshot, message ids in ascending order)
+        self.memory = LRUCache(max_entries=CACHE_MAX_ENTRIES, ttl=CACHE_TTL_SECONDS)
+        self.flight = SingleFlight()
+
+    async def deliver(self, bot: Bot, chat_id: int, snapshot) -> int:
+        """Copy the snapshot's wishes into chat_id; returns the number of copies"""
+        message_ids = await self._message_ids(bot, snapshot)
+        # Strictly increasing ids, at most BATCH_SIZE per call
+        for i in range(0, len(message_ids), self.BATCH_SIZE):
+            await bot.copy_messages(
+                chat_id=chat_id,
+                from_chat_id=self.chat_id,
+                message_ids=message_ids[i:i + self.BATCH_SIZE],
+            )
+        return len(message_ids)
+
+    async def _message_ids(self, bot: Bot, snapshot) -> List[int]:
+        owner_id = snapshot.owner.user_id
+        cached = self.memory.get(owner_id)
+        if cached is not None and cached[0] is snapshot:
+            return cached[1]
+
+        # Concurrent viewers of a changed list post its wishes once; a
+        # viewer with a newer list does not join an older list's posting
+        message_ids = await self.flight.do(
+            ('materialize', owner_id, snapshot.list_version),
+            lambda: self._materialize(bot, snapshot)
+        )
+        self.memory.set(owner_id, (snapshot, message_ids))
+        return message_ids
+
+    async def _materialize(self, bot: Bot, snapshot) -> List[int]:
+        """Bring the storage chat up to date with the snapshot"""
+        owner_id = snapshot.owner.user_id
+        stored = await get_shared_messages(owner_id)
+        wish_ids = {wish.wish_id for wish in snapshot.wishes}
+        removed = [wish_id for wish_id in stored if wish_id not in wish_ids]
+
+        posted: Dict[int, Tuple[int, Optional[datetime]]] = {}
+        try:
+            # The list is newest first: post the oldest first
+            for wish in reversed(snapshot.wishes):
+                current = stored.get(wish.wish_id)
+                if current is not None and current[1] == wish.updated_at:
+                    continue
+                message = await self._post(bot, wish)
+                posted[wish.wish_id] = (message.message_id, wish.updated_at)
+        finally:
+            # Whatever was posted is kept, even if a later post failed
+            if posted or removed:
+                await save_shared_messages(owner_id, posted, removed)
+
+        outdated = [stored[wish_id][0] for wish_id in removed]
+        outdated += [stored[wish_id][0] for wish_id in posted if wish_id in stored]
+        await self._delete(bot, outdated)
+
+        stored.update(posted)
+        return sorted(stored[wish_id][0] for wish_id in wish_ids)
+
+    async def _post(self, bot: Bot, wish: WishView) -> Message:
+        rendered = self.render(wish)
+        if rendered.photo:
+            return await bot.send_photo(
+                self.chat_id,
+                photo=rendered.photo,
+                caption=rendered.text,
+                parse_mode=rendered.parse_mode,
+                disable_notification=True,
+            )
+        return await bot.send_message(
+            self.chat_id,
+            rendered.text,
+            parse_mode=rendered.parse_mode,
+            disable_notification=True,
+        )
+
+    async def _delete(self, bot: Bot, message_ids: List[int]):
+        """Remove copies nobody gets anymore (failures only leave clutter)"""
+        message_ids = sorted(message_ids)
+        for i in range(0, len(message_ids), self.BATCH_SIZE):
+            try:
+                await bot.delete_messages(self.chat_id, message_ids[i:i + self.BATCH_SIZE])
+            except TelegramError as e:
+                logger.warning(f"Could not delete stored wishes: {e}")
@@ -0,0 +1,35 @@
+import asyncio
+import contextvars
+from typing import Awaitable, Callable, Dict, Hashable, TypeVar
+
+T = TypeVar("T")
+
+
+class SingleFlight:
+    """
+    Request coalescing.
+
+    While a call for a key is in flight, later callers with the same key
+    await that call and share its result (or exception) instead of running
+    the query again. The shared call runs in a fresh context, so it never
+    borrows the unit of work (session) of whichever caller started it, and
+    a cancelled caller does not cancel it for the others.
+    """
+
+    def __init__(self):
+        self._calls: Dict[Hashable, asyncio.Task] = {}
+
+    async def do(self, key: Hashable, fn: Callable[[], Awaitable[T]]) -> T:
+        task = self._calls.get(key)
+        if task is None:
+            task = asyncio.create_task(fn(), context=contextvars.Context())
+            self._calls[key] = task
+            task.add_done_callback(lambda done: self._forget(key, done))
+        return await asyncio.shield(task)
+
+    def _forget(self, key: Hashable, task: asyncio.Task):
+        if self._calls.get(key) is task:
+            del self._calls[key]
+        # Every waiter may have been cancelled: mark the result as retrieved
+        if not task.cancelled():
+            task.exception()
@@ -0,0 +1,78 @@
+from datetime import datetime, timedelta
+from typing import Optional
+
+from telegram import Bot, File
+
+from database import get_telegram_file, save_telegram_file
+from models import TelegramFileView
+from services.cache import LRUCache
+
+
+class TelegramFileCache:
+    """
+    Cache of Bot API getFile results.
+
+    Telegram guarantees a file's download link for at least an hour, so
+    within LINK_TTL the stored path is reused instead of calling getFile
+    again. Results live in memory and in the telegram_files table (shared
+    by workers and kept across restarts). Paths are stored without the
+    bot's file URL, which contains the token.
+    """
+
+    LINK_TTL = timedelta(minutes=55)  # A margin below Telegram's hour
+
+    def __init__(self, max_entries: int = 1024):
+        self.memory = LRUCache(max_entries=max_entries)
+
+    async def get_file(
+        self, bot: Bot, file_id: str, file_unique_id: Optional[str] = None
+    ) -> File:
+        """Same as bot.get_file(file_id), without the API call while the link is valid"""
+        key = file_unique_id or file_id
+        cached = self.memory.get(key)
+        if cached is None:
+            cached = await get_telegram_file(file_unique_id=file_unique_id, file_id=file_id)
+
+        if cached is None or self._remaining(cached) <= 0:
+            telegram_file = await bot.get_file(file_id)
+            cached = TelegramFileView(
+                file_unique_id=telegram_file.file_unique_id,
+                file_id=telegram_file.file_id,
+                file_path=self._relative_path(bot, telegram_file.file_path),
+                file_size=telegram_file.file_size,
+                fetched_at=datetime.utcnow(),
+            )
+            await save_telegram_file(cached)
+
+        self.memory.set(key, cached, ttl=self._remaining(cached))
+        return self._to_file(bot, cached)
+
+    def _remaining(self, cached: TelegramFileView) -> float:
+        """Seconds the stored link stays valid"""
+        return (cached.fetched_at + self.LINK_TTL - datetime.utcnow()).total_seconds()
+
+    @staticmethod
+    def _relative_path(bot: Bot, file_path: Optional[str]) -> Optional[str]:
+        prefix = f"{bot.base_file_url}/"
+        if file_path and file_path.startswith(prefix):
+            return file_path[len(prefix):]
+        return file_path  # Local Bot API server: an absolute path on disk
+
+    @staticmethod
+    def _to_file(bot: Bot, cached: TelegramFileView) -> File:
+        file_path = cached.file_path
+        if file_path and not file_path.startswith("/"):
+            file_path = f"{bot.base_file_url}/{file_path}"
+
+        telegram_file = File(
+            file_id=cached.file_id,
+            file_unique_id=cached.file_unique_id,
+            file_size=cached.file_size,
+            file_path=file_path,
+        )
+        telegram_file.set_bot(bot)
+        return telegram_file
+
+
+# Global instance
+telegram_files = TelegramFileCache()
@@ -0,0 +1,73 @@
+import asyncio
+import logging
+from collections import Counter
+from typing import Iterable, Optional
+
+from database import add_view_counts
+
+logger = logging.getLogger(__name__)
+
+
+class ViewCounter:
+    """
+    Shared wishlist views, counted in memory and written in batches.
+
+    A view only increments in-memory counters (per owner and per wish);
+    every `interval` seconds everything counted since the previous flush is
+    added to the database with one bulk UPDATE per table, so opening a
+    shared list never waits for a write. Counts not yet flushed are lost
+    if the process dies.
+    """
+
+    def __init__(self, interval: float = 30.0):
+        self.interval = interval
+        self.owners: Counter = Counter()
+        self.wishes: Counter = Counter()
+        self._task: Optional[asyncio.Task] = None
+
+    def record(self, owner_id: Optional[int] = None, wish_ids: Iterable[int] = ()):
+        """Count an opened shared list (owner_id) and the wishes shown"""
+        if owner_id is not None:
+            self.owners[owner_id] += 1
+        for wish_id in wish_ids:
+            self.wishes[wish_id] += 1
+
+    def pending(self, owner_id: int) -> int:
+        """Views of the owner's list counted here but not written yet"""
+        return self.owners[owner_id]
+
+    async def start(self):
+        self._task = asyncio.create_task(self._run(), name="view-counts")
+
+    async def stop(self):
+        """Stop flushing periodically and write what is left"""
+        if self._task is not None:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+        try:
+            await self.flush()
+        except Exception as e:
+            logger.error(f"Failed to save view counts: {e}")
+
+    async def flush(self):
+        """Write the counts collected since the previous flush"""
+        if not self.owners and not self.wishes:
+            return
+        owners, wishes = self.owners, self.wishes
+        self.owners, self.wishes = Counter(), Counter()
+        try:
+            await add_view_counts(owners, wishes)
+        except Exception:
+            # Kept for the next flush
+            self.owners.update(owners)
+            self.wishes.update(wishes)
+            raise
+
+    async def _run(self):
+        while True:
+            await asyncio.sleep(self.interval)
+            try:
+                await self.flush()
+            except Exception as e:
+                logger.error(f"Failed to save view counts: {e}")
@@ -1,12 +1,69 @@
-from typing import List, Optional
+import asyncio
+import contextvars
+import logging
+import secrets
+import time
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from typing import Awaitable, Callable, Dict, Hashable, Iterable, List, Optional, Tuple, TypeVar
 from database import (
     add_wish as db_add_wish,
-    get_user_wishes as db_get_user_wishes,
+    upsert_user as db_upsert_user,
+    get_user as db_get_user,
+    get_user_by_share_code as db_get_user_by_share_code,
+    get_share_codes as db_get_share_codes,
+    set_share_code as db_set_share_code,
+    get_users as db_get_users,
+    get_wishes_of_users as db_get_wishes_of_users,
+    prime_known_users,
+    get_versioned_wishes as db_get_versioned_wishes,
+    get_user_wishes_page as db_get_user_wishes_page,
+    get_wish_count as db_get_wish_count,
     get_wish as db_get_wish,
     delete_wish as db_delete_wish,
-    update_wish as db_update_wish
+    update_wish as db_update_wish,
+    after_commit,
+    current_unit_of_work,
+    CACHE_CHANGELOG
 )
-from models import Wish
+from models import UserView, WishView
+from config import (
+    CACHE_MAX_ENTRIES,
+    CACHE_MAX_BYTES,
+    CACHE_TTL_SECONDS,
+    CACHE_SYNC_INTERVAL,
+    NEGATIVE_CACHE_TTL,
+    SHARE_SNAPSHOT_TTL,
+    CACHE_WARMUP_USERS,
+    ACTIVE_USERS_FILE,
+    VIEW_COUNTS_FLUSH_INTERVAL,
+    REDIS_URL
+)
+from services.activity import RecentUsers
+from services.bloom import BloomFilter
+from services.cache import LRUCache, CacheStats
+from services.cache_sync import ChangelogPoller, RedisCache
+from services.singleflight import SingleFlight
+from services.view_counts import ViewCounter
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+
+@dataclass(frozen=True, slots=True)
+class SharedSnapshot:
+    """Everything a shared wishlist view shows, as of `taken_at` (monotonic)"""
+    owner: UserView
+    wishes: tuple[WishView, ...]
+    list_version: int
+    taken_at: float
+
+
+def new_share_code() -> str:
+    """Random code for a share link (72 bits, safe in deep links)"""
+    return secrets.token_urlsafe(9)
+
 
 class WishlistService:
     """Service layer for wishlist operations"""
@@ -14,17 +71,287 @@ class WishlistService:
     MAX_WISHES_PER_USER = 100
     MIN_TITLE_LENGTH = 3
     MAX_TITLE_LENGTH = 100
+    PAGE_SIZE = 10
+    # Minimum seconds between looking for users created by other workers
+    SHARE_CODES_REFRESH = 5
 
     def __init__(self):
-        self.cache = {}
+        # user_id -> (list version, list of the user's wishes)
+        self.cache = LRUCache(
+            max_entries=CACHE_MAX_ENTRIES,
+            max_bytes=CACHE_MAX_BYTES,
+            ttl=CACHE_TTL_SECONDS
+        )
+        # user_id -> (list version, {wish_id: wish}), filled from lists and
+        # single lookups and written through on writes. Scoped by owner so a
+        # new list version (here or in another worker) covers all of their wishes.
+        self.wish_cache = LRUCache(
+            max_entries=CACHE_MAX_ENTRIES,
+            max_bytes=CACHE_MAX_BYTES,
+            ttl=CACHE_TTL_SECONDS
+        )
+        # user_id -> latest list version this worker has seen. Entries above
+        # count only while their version is not older, so a read that raced
+        # with a write can never cache what it read. Entries of older
+        # versions are dropped when a newer one arrives, so an evicted
+        # version leaves nothing stale behind
+        self.list_versions = LRUCache(
+            max_entries=4 * CACHE_MAX_ENTRIES,
+            ttl=CACHE_TTL_SECONDS
+        )
+        # Lookups that found nothing, as ('wish', user_id, wish_id),
+        # ('user', user_id) or ('share', code). Short-lived, and dropped
+        # when this worker creates the row
+        self.missing = LRUCache(
+            max_entries=CACHE_MAX_ENTRIES,
+            ttl=NEGATIVE_CACHE_TTL
+        )
+        # Share codes of all users: unknown codes are rejected without a
+        # query (loaded in start())
+        self.share_codes: Optional[BloomFilter] = None
+        self._share_codes_since: Optional[datetime] = None
+        self._share_codes_checked = 0.0
+        # share code -> owner's user_id
+        self.share_owners = LRUCache(
+            max_entries=CACHE_MAX_ENTRIES,
+            ttl=CACHE_TTL_SECONDS
+        )
+        # owner's user_id -> SharedSnapshot. Viewers get the snapshot right
+        # away; once older than SHARE_SNAPSHOT_TTL or marked stale by the
+        # owner's changes it is refreshed in the background. Past the cache
+        # TTL it is gone and the next viewer waits for a fresh one.
+        self.snapshots = LRUCache(
+            max_entries=CACHE_MAX_ENTRIES,
+            max_bytes=CACHE_MAX_BYTES,
+            ttl=CACHE_TTL_SECONDS
+        )
+        self._stale_snapshots: set[int] = set()
+        self._refreshing: Dict[int, asyncio.Task] = {}
+        # Bumped when negative entries are dropped: a lookup that found
+        # nothing is cached only if no row was created while it ran
+        self._epoch = 0
+
+        # Keeps other workers' caches coherent (see services/cache_sync.py)
+        self.shared = (
+            RedisCache(REDIS_URL, self._apply_versions, self._reset_local, ttl=CACHE_TTL_SECONDS)
+            if REDIS_URL
+            else None
+        )
+        self.changelog = (
+            ChangelogPoller(self._apply_versions, interval=CACHE_SYNC_INTERVAL)
+            if CACHE_CHANGELOG
+            else None
+        )
+        self._pending_invalidations: set[asyncio.Task] = set()
+
+        # Concurrent identical reads share one query
+        self.flight = SingleFlight()
+
+        # Whose data is prefetched after a restart (see warm_up)
+        self.recent_users = RecentUsers(ACTIVE_USERS_FILE, max_users=CACHE_WARMUP_USERS)
+
+        # Shared wishlist views, written in batches
+        self.views = ViewCounter(interval=VIEW_COUNTS_FLUSH_INTERVAL)
+
+    async def start(self):
+        """Load the share codes and start listening for invalidations from other workers"""
+        if CACHE_WARMUP_USERS > 0:
+            self.recent_users.load()
+        await self._load_share_codes()
+        if self.shared is not None:
+            await self.shared.start()
+        if self.changelog is not None:
+            await self.changelog.start()
+        await self.views.start()
+
+    async def stop(self):
+        await self.views.stop()
+        for task in list(self._refreshing.values()):
+            task.cancel()
+        await asyncio.gather(*self._refreshing.values(), return_exceptions=True)
+        if self.changelog is not None:
+            await self.changelog.stop()
+        if self.shared is not None:
+            await asyncio.gather(*self._pending_invalidations, return_exceptions=True)
+            await self.shared.stop()
+        if CACHE_WARMUP_USERS > 0:
+            self.recent_users.save()
+
+    async def warm_up(self, batch_size: int = 100, concurrency: int = 4):
+        """
+        Prefetch wishlists and profiles of the recently active users, in
+        batches of `batch_size` users per query
+        """
+        user_ids = self.recent_users.most_recent()
+        if not user_ids:
+            return
+
+        started = time.monotonic()
+        semaphore = asyncio.Semaphore(concurrency)
+
+        async def load_batch(batch: List[int]):
+            async with semaphore:
+                # Versions are read first: wishes read after them are at
+                # least that new
+                users = await db_get_users(batch)
+                wishes = await db_get_wishes_of_users(
+                    [user.user_id for user in users]
+                )
+                # Their first update skips the user upsert
+                prime_known_users(users)
+                for user in users:
+                    # Never replace what has been cached meanwhile
+                    if user.user_id not in self.cache:
+                        self._store_wishlist(
+                            user.user_id, user.list_version, wishes.get(user.user_id, [])
+                        )
+
+        await asyncio.gather(*(
+            load_batch(user_ids[i:i + batch_size])
+            for i in range(0, len(user_ids), batch_size)
+        ))
+        logger.info(
+            f"🔥 Cache warmed up for {len(user_ids)} users "
+            f"in {time.monotonic() - started:.1f}s"
+        )
+
+    def cache_stats(self) -> Dict[str, CacheStats]:
+        """Hit/miss/eviction counters of the caches"""
+        return {
+            'wishlists': self.cache.stats(),
+            'wishes': self.wish_cache.stats(),
+            'missing': self.missing.stats(),
+            'snapshots': self.snapshots.stats(),
+        }
+
+    # ===== CACHE INVALIDATION =====
+
+    def _known_version(self, user_id: int) -> int:
+        """Latest list version seen for the user (-1: none since the start)"""
+        return self.list_versions.get(user_id, -1)
+
+    def _apply_versions(self, versions: Dict[int, Optional[int]]):
+        """New list versions, from this or another worker (None: unknown)"""
+        for user_id, version in versions.items():
+            if version is None:
+                # Share code changed, or logged before list versions existed
+                self.cache.pop(user_id)
+                self.wish_cache.pop(user_id)
+                self.snapshots.pop(user_id)
+                self._stale_snapshots.discard(user_id)
+            elif version > self._known_version(user_id):
+                self.list_versions.set(user_id, version)
+                self._drop_older(self.cache, user_id, version)
+                self._drop_older(self.wish_cache, user_id, version)
+                snapshot = self.snapshots.peek(user_id)
+                if snapshot is not None and snapshot.list_version < version:
+                    # Still served while a fresh one is read
+                    self._stale_snapshots.add(user_id)
+
+    @staticmethod
+    def _drop_older(cache: LRUCache, user_id: int, version: int):
+        entry = cache.peek(user_id)
+        if entry is not None and entry[0] < version:
+            cache.pop(user_id)
+
+    def _reset_local(self):
+        self._epoch += 1
+        self.cache.clear()
+        self.wish_cache.clear()
+        self.snapshots.clear()
+        self._stale_snapshots.clear()
+
+    def _mark_snapshot_stale(self, user_id: int):
+        if user_id in self.snapshots:
+            self._stale_snapshots.add(user_id)
+
+    def _current(self, cache: LRUCache, user_id: int) -> Optional[tuple]:
+        """The user's (version, value) entry, unless a newer list version is known"""
+        entry = cache.get(user_id)
+        if entry is None or entry[0] >= self._known_version(user_id):
+            return entry
+        cache.pop(user_id)
+        return None
+
+    def _store(self, cache: LRUCache, user_id: int, version: int, value) -> bool:
+        """Cache a value read at `version`, unless a newer list version is known"""
+        if version < self._known_version(user_id):
+            return False
+        cache.set(user_id, (version, value))
+        return True
+
+    def _store_wishlist(self, user_id: int, version: int, wishes: List[WishView]):
+        if self._store(self.cache, user_id, version, wishes):
+            self._store(self.wish_cache, user_id, version, {w.wish_id: w for w in wishes})
+
+    @staticmethod
+    def _in_write_transaction() -> bool:
+        """True if this update wrote something that may not be committed yet"""
+        uow = current_unit_of_work()
+        return uow is not None and uow.wrote
+
+    def _wishes_changed(
+        self,
+        user_id: int,
+        list_version: int,
+        written: Optional[WishView] = None,
+        deleted_id: Optional[int] = None
+    ):
+        """
+        A wish write took the user's list to `list_version`: once it is
+        committed, older cached entries stop counting, the cached data is
+        patched and other workers are told (a rollback leaves it all as is)
+        """
+        after_commit(
+            lambda: self._wishes_committed(user_id, list_version, written, deleted_id)
+        )
+
+    def _wishes_committed(
+        self,
+        user_id: int,
+        list_version: int,
+        written: Optional[WishView],
+        deleted_id: Optional[int]
+    ):
+        # Entries of the previous version differ only by this write: patch
+        # them before the new version drops whatever is older
+        entry = self.cache.get(user_id)
+        if entry is not None and entry[0] == list_version - 1:
+            wishes = [w for w in entry[1] if w.wish_id != deleted_id]
+            if written is not None:
+                if any(w.wish_id == written.wish_id for w in wishes):
+                    wishes = [written if w.wish_id == written.wish_id else w for w in wishes]
+                else:
+                    # A new wish is the newest one
+                    wishes = [written, *wishes]
+            self._store(self.cache, user_id, list_version, wishes)
+
+        entry = self.wish_cache.get(user_id)
+        wishes = dict(entry[1]) if entry is not None and entry[0] == list_version - 1 else {}
+        if written is not None:
+            wishes[written.wish_id] = written
+            self.missing.pop(('wish', user_id, written.wish_id))
+        if deleted_id is not None:
+            wishes.pop(deleted_id, None)
+            # Buttons of the deleted wish
+            self.missing.set(('wish', user_id, deleted_id), True)
+        self._store(self.wish_cache, user_id, list_version, wishes)
+
+        self._apply_versions({user_id: list_version})
+        self._publish(user_id, list_version)
+
+    def _publish(self, user_id: int, list_version: Optional[int]):
+        """Tell the other workers through Redis (the changelog needs nothing)"""
+        if self.shared is not None:
+            task = asyncio.create_task(self.shared.invalidate(user_id, list_version))
+            self._pending_invalidations.add(task)
+            task.add_done_callback(self._pending_invalidations.discard)
 
-    
     # ===== BUSINESS LOGIC =====
 
-    def can_add_wish(self, user_id: int) -> bool:
+    async def can_add_wish(self, user_id: int) -> bool:
         """Check if user can add more wishes"""
-        current_wishes = self.get_user_wishes(user_id)
-        return len(current_wishes) < self.MAX_WISHES_PER_USER
+        return await db_get_wish_count(user_id) < self.MAX_WISHES_PER_USER
     
     def validate_title(self, title: str) -> tuple[bool, Optional[str]]:
         """
@@ -51,7 +378,7 @@ class WishlistService:
     
     # ===== CRUD OPERATIONS (with logic) =====
 
-    def add_wish(
+    async def add_wish(
         self,
         user_id: int,
         title: str,
@@ -59,13 +386,13 @@ class WishlistService:
         url: Optional[str] = None,
         price: Optional[str] = None,
         image_file_id: Optional[str] = None
-    ) -> tuple[Optional[Wish], Optional[str]]:
+    ) -> tuple[Optional[WishView], Optional[str]]:
         """
         Add a new wish with validation
         Returns: (wish, error_message)
         """
         # Limit check
-        if not self.can_add_wish(user_id):
+        if not await self.can_add_wish(user_id):
             return None, f"You've reached the limit of {self.MAX_WISHES_PER_USER} wishes"
         
         # Title validation
@@ -79,7 +406,7 @@ class WishlistService:
             return None, error
         
         # Save to db
-        wish = db_add_wish(
+        wish, list_version = await db_add_wish(
             user_id=user_id,
             title=title.strip(),
             description=description.strip() if description else None,
@@ -88,60 +415,346 @@ class WishlistService:
             image_file_id=image_file_id
         )
 
-        if user_id in self.cache:
-            del self.cache[user_id]
+        self._wishes_changed(user_id, list_version, written=wish)
 
         return wish, None
 
 
-    def get_user_wishes(self, user_id: int) -> List[Wish]:
+    async def get_user_wishes(self, user_id: int) -> List[WishView]:
         """Get all wishes for a user (with caching)"""
+        _, wishes = await self._get_wishlist(user_id)
+        return wishes
+
+    async def _get_wishlist(self, user_id: int) -> Tuple[int, List[WishView]]:
+        """The user's wishes and the list version they are current at"""
         # Check cache
-        if user_id in self.cache:
-            return self.cache[user_id]
-        
-        # Get from db
-        wishes = db_get_user_wishes(user_id)
+        entry = self._current(self.cache, user_id)
+        if entry is not None:
+            return entry
+
+        # A read started after a write must not join a query started before it
+        list_version, wishes = await self._coalesce(
+            ('wishlist', user_id, self._known_version(user_id)),
+            lambda: self._load_wishes(user_id)
+        )
 
-        # Save to cache
-        self.cache[user_id] = wishes
+        # Save to cache (unless it holds this update's uncommitted writes)
+        if not self._in_write_transaction():
+            self._store_wishlist(user_id, list_version, wishes)
 
-        return wishes
+        return list_version, wishes
+
+    async def _load_wishes(self, user_id: int) -> Tuple[int, List[WishView]]:
+        """Cache miss: read the shared cache, then the db"""
+        # Shared cache hits are as new as the version known before reading
+        list_version = self._known_version(user_id)
+        wishes, version = None, None
+        if self.shared is not None:
+            wishes, version = await self.shared.get_wishlist(user_id)
+
+        if wishes is None:
+            # Get from db
+            wishes, list_version = await db_get_versioned_wishes(user_id)
+            if version is not None:
+                await self.shared.set_wishlist(user_id, version, wishes)
+
+        return list_version, wishes
+
+    async def get_user(self, user_id: int) -> Optional[UserView]:
+        """Get a user (concurrent lookups of the same user share one query)"""
+        if self.missing.get(('user', user_id)):
+            return None
+
+        epoch = self._epoch
+        user = await self._coalesce(('user', user_id), lambda: db_get_user(user_id))
+        if user is None and epoch == self._epoch:
+            self.missing.set(('user', user_id), True)
+        return user
+
+    async def register_user(
+        self,
+        user_id: int,
+        username: Optional[str] = None,
+        first_name: Optional[str] = None
+    ):
+        """Create the user or refresh their profile (runs for every update)"""
+        self.recent_users.record(user_id)
+        # Only used if the user is new
+        share_code = new_share_code()
+        if not await db_upsert_user(user_id, username, first_name, share_code):
+            return
+
+        if self.share_codes is not None:
+            self.share_codes.add(share_code)
+
+        def committed():
+            self._forget_missing(('user', user_id), ('share', share_code))
+            # The profile changed: shared views show the new name
+            self._mark_snapshot_stale(user_id)
+
+        after_commit(committed)
+
+    def _forget_missing(self, *keys):
+        self._epoch += 1
+        for key in keys:
+            self.missing.pop(key)
+
+    # ===== SHARE CODES =====
+
+    async def rotate_share_code(self, user_id: int) -> str:
+        """Give the user a new share link; the old one stops working"""
+        share_code = new_share_code()
+        await self._replace_share_code(user_id, share_code)
+        return share_code
+
+    async def revoke_share_code(self, user_id: int):
+        """Turn the user's share link off (until the next rotation)"""
+        await self._replace_share_code(user_id, None)
+
+    async def _replace_share_code(self, user_id: int, share_code: Optional[str]):
+        previous = await db_set_share_code(user_id, share_code)
+        if share_code is not None and self.share_codes is not None:
+            self.share_codes.add(share_code)
+
+        def committed():
+            if previous is not None:
+                self.share_owners.pop(previous)
+            if share_code is not None:
+                self._forget_missing(('share', share_code))
+            self.snapshots.pop(user_id)
+            self._stale_snapshots.discard(user_id)
+            self._publish(user_id, None)
+
+        after_commit(committed)
+
+    async def resolve_share_code(self, share_code: str) -> Optional[UserView]:
+        """Find the user a share code belongs to (None if nobody has it)"""
+        if self.missing.get(('share', share_code)):
+            return None
+        if not await self._may_be_share_code(share_code):
+            return None
+
+        epoch = self._epoch
+        user = await self._coalesce(
+            ('share', share_code), lambda: db_get_user_by_share_code(share_code)
+        )
+        if user is None and epoch == self._epoch:
+            self.missing.set(('share', share_code), True)
+        return user
+
+    async def get_shared_snapshot(
+        self,
+        share_code: str,
+        viewer_id: Optional[int] = None
+    ) -> Optional[SharedSnapshot]:
+        """
+        Get what the shared wishlist view shows (None for unknown codes).
+        Served from the snapshot when there is one, even a stale one
+        (it is refreshed in the background meanwhile) - except for the
+        owner, who always sees their own changes
+        """
+        owner_id = self.share_owners.get(share_code)
+        if owner_id is None:
+            owner = await self.resolve_share_code(share_code)
+            if owner is None:
+                return None
+            owner_id = owner.user_id
+            self.share_owners.set(share_code, owner_id)
+
+        snapshot = self.snapshots.get(owner_id)
+        # Older than the owner's wishes, or than their profile
+        stale = snapshot is not None and (
+            snapshot.list_version < self._known_version(owner_id)
+            or owner_id in self._stale_snapshots
+        )
+        if snapshot is None or (stale and owner_id == viewer_id):
+            snapshot = await self.flight.do(
+                ('snapshot', owner_id, self._known_version(owner_id)),
+                lambda: self._take_snapshot(owner_id)
+            )
+        elif stale or time.monotonic() - snapshot.taken_at > SHARE_SNAPSHOT_TTL:
+            self._refresh_snapshot_later(owner_id)
+
+        # The code was rotated or revoked since it was looked up
+        if snapshot is None or snapshot.owner.share_code != share_code:
+            self.share_owners.pop(share_code)
+            return None
+        return snapshot
+
+    async def _take_snapshot(self, owner_id: int) -> Optional[SharedSnapshot]:
+        self._stale_snapshots.discard(owner_id)
+
+        owner = await db_get_user(owner_id)
+        if owner is None:
+            self.snapshots.pop(owner_id)
+            return None
+        list_version, wishes = await self._get_wishlist(owner_id)
+
+        snapshot = SharedSnapshot(
+            owner=owner,
+            wishes=tuple(wishes),
+            list_version=list_version,
+            taken_at=time.monotonic()
+        )
+        self.snapshots.set(owner_id, snapshot)
+        return snapshot
+
+    def count_shared_view(
+        self,
+        owner_id: int,
+        viewer_id: int,
+        wish_ids: Iterable[int],
+        opened: bool = False
+    ):
+        """
+        Count the wishes a viewer was shown (opened: they opened the link).
+        Owners looking at their own list are not counted
+        """
+        if viewer_id != owner_id:
+            self.views.record(owner_id if opened else None, wish_ids)
+
+    def share_views(self, user: UserView) -> int:
+        """How often the user's share link was opened (including unsaved views)"""
+        return user.share_views + self.views.pending(user.user_id)
+
+    def _refresh_snapshot_later(self, owner_id: int):
+        if owner_id in self._refreshing:
+            return
+        # Fresh context: the refresh must not use the viewer's unit of work
+        task = asyncio.create_task(
+            self._refresh_snapshot(owner_id), context=contextvars.Context()
+        )
+        self._refreshing[owner_id] = task
+        task.add_done_callback(lambda _: self._refreshing.pop(owner_id, None))
+
+    async def _refresh_snapshot(self, owner_id: int):
+        try:
+            await self.flight.do(
+                ('snapshot', owner_id, self._known_version(owner_id)),
+                lambda: self._take_snapshot(owner_id)
+            )
+        except Exception as e:
+            logger.error(f"Failed to refresh the shared wishlist of {owner_id}: {e}")
+
+    async def _may_be_share_code(self, share_code: str) -> bool:
+        """False if no user has the code (checked without a query where possible)"""
+        if self.share_codes is None:
+            return True
+        if share_code in self.share_codes:
+            return True
+
+        # The user may have been created by another worker: catch up, but
+        # at most every SHARE_CODES_REFRESH seconds however many bad codes arrive
+        if time.monotonic() - self._share_codes_checked < self.SHARE_CODES_REFRESH:
+            return False
+        await self.flight.do(('share_codes',), self._catch_up_share_codes)
+        return share_code in self.share_codes
+
+    async def _load_share_codes(self):
+        """Build the share code filter from all users"""
+        started = datetime.utcnow()
+        codes = await db_get_share_codes()
+        share_codes = BloomFilter(capacity=max(1024, 2 * len(codes)))
+        for share_code in codes:
+            share_codes.add(share_code)
+
+        self.share_codes = share_codes
+        self._share_codes_since = started
+        self._share_codes_checked = time.monotonic()
+
+    async def _catch_up_share_codes(self):
+        """Add the codes set since the last load (by any worker)"""
+        if self.share_codes.saturated:
+            await self._load_share_codes()
+            return
+
+        self._share_codes_checked = time.monotonic()
+        started = datetime.utcnow()
+        # The margin covers clock drift between workers and replica lag
+        codes = await db_get_share_codes(
+            changed_since=self._share_codes_since - timedelta(seconds=60)
+        )
+        for share_code in codes:
+            self.share_codes.add(share_code)
+        self._share_codes_since = started
+
+    async def _coalesce(self, key: Hashable, load: Callable[[], Awaitable[T]]) -> T:
+        """Run a read through single-flight"""
+        uow = current_unit_of_work()
+        if uow is not None and uow.wrote:
+            # A shared query runs in its own session and could miss
+            # this update's uncommitted writes
+            return await load()
+        return await self.flight.do(key, load)
+
+    async def get_wishes_page(
+        self,
+        user_id: int,
+        after: Optional[tuple[datetime, int]] = None,
+        limit: Optional[int] = None
+    ) -> tuple[List[WishView], Optional[tuple[datetime, int]]]:
+        """
+        Get one page of wishes for a user
+        Returns: (wishes, cursor of the next page or None on the last page)
+        """
+        limit = limit or self.PAGE_SIZE
+
+        # Fetch one extra row to know whether another page exists
+        wishes = await db_get_user_wishes_page(user_id, limit + 1, after=after)
+        if len(wishes) <= limit:
+            return wishes, None
+
+        wishes = wishes[:limit]
+        last = wishes[-1]
+        return wishes, (last.created_at, last.wish_id)
     
-    def get_wish(self, wish_id: int, user_id: int) -> Optional[Wish]:
+    async def get_wish(self, wish_id: int, user_id: int) -> Optional[WishView]:
         """
         Get a wish by ID with ownership check
         Returns None if wish doesn't exist or doesn't belong to user
         """
-        wish = db_get_wish(wish_id)
-
-        if not wish:
+        # Only the owner's wishes are cached under their user_id
+        entry = self._current(self.wish_cache, user_id)
+        if entry is not None and wish_id in entry[1]:
+            return entry[1][wish_id]
+        # E.g. buttons of a deleted wish pressed again
+        if self.missing.get(('wish', user_id, wish_id)):
             return None
-        
-        # Owner verification
-        if wish.user_id != user_id:
+
+        list_version = self._known_version(user_id)
+        wish = await db_get_wish(wish_id, user_id)
+        # Cached only if none of the user's wishes was written meanwhile
+        unchanged = (
+            self._known_version(user_id) == list_version
+            and not self._in_write_transaction()
+        )
+
+        # Existence and owner verification
+        if not wish or wish.user_id != user_id:
+            if unchanged:
+                self.missing.set(('wish', user_id, wish_id), True)
             return None
-        
+
+        if unchanged:
+            entry = self._current(self.wish_cache, user_id)
+            version, wishes = entry if entry is not None else (list_version, {})
+            self._store(self.wish_cache, user_id, version, {**wishes, wish.wish_id: wish})
+
         return wish
     
-    def update_wish(
+    async def update_wish(
         self,
         wish_id: int,
         user_id: int,
         **updates
-    )-> tuple[Optional[Wish], Optional[str]]:
+    )-> tuple[Optional[WishView], Optional[str]]:
         """
         Update wish with validation
         Returns: (updated_wish, error_message)
         """
-        # Check existence and owner
-        wish = self.get_wish(wish_id, user_id)
-        if not wish:
-            return None, "Wish not found or access denied"
-        
         # Validate title if updated
         if 'title' in updates:
-            is_valid, error = self.validate_url(updates['title'])
+            is_valid, error = self.validate_title(updates['title'])
             if not is_valid:
                 return None, error
             
@@ -151,33 +764,30 @@ class WishlistService:
             if not is_valid:
                 return None, error
             
-        # Update db
-        updated_wish = db_update_wish(wish_id, user_id, **updates)
+        # Update db (existence and owner are checked by the same statement)
+        updated_wish, list_version = await db_update_wish(wish_id, user_id, **updates)
+        if not updated_wish:
+            return None, "Wish not found or access denied"
 
-        # Disable cache
-        if user_id in self.cache:
-            del self.cache[user_id]
+        # None: nothing to update, nothing changed
+        if list_version is not None:
+            self._wishes_changed(user_id, list_version, written=updated_wish)
 
         return updated_wish, None
     
-    def delete_wish(self, wish_id: int, user_id: int) -> tuple[bool, Optional[str]]:
+    async def delete_wish(self, wish_id: int, user_id: int) -> tuple[bool, Optional[str]]:
         """
         Delete wish with ownership check
         Returns: (success, error_message)
         """
-        # Check existence and owner
-        wish = self.get_wish(wish_id, user_id)
-        if not wish:
+        # Delete from db (existence and owner are checked by the same statement)
+        list_version = await db_delete_wish(wish_id, user_id)
+        if list_version is None:
             return False, "Wish not found or access denied"
-        
-        # Delete from db 
-        success = db_delete_wish(wish_id, user_id)
 
-        # Disable cache
-        if user_id in self.cache:
-            del self.cache[user_id]
+        self._wishes_changed(user_id, list_version, deleted_id=wish_id)
 
-        return success, None if success else "Failed to delete"
+        return True, None
 
 # Global instance (singleton)
 wishlist_service = WishlistService()
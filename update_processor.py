@@ -0,0 +1,62 @@
+import asyncio
+from typing import Awaitable, Dict, Hashable, Optional
+
+from telegram import Update
+from telegram.ext import BaseUpdateProcessor
+
+
+class PerChatUpdateProcessor(BaseUpdateProcessor):
+    """
+    Concurrent updates, but one at a time per chat and user.
+
+    Up to `max_concurrent_updates` updates run in parallel. Updates of the
+    same (chat, user) pair wait for each other in arrival order, so
+    ConversationHandler states and user_data are never raced (the key
+    matches the conversations' default per_chat/per_user). Updates with
+    neither a chat nor a user are not serialized.
+    """
+
+    def __init__(self, max_concurrent_updates: int):
+        super().__init__(max_concurrent_updates)
+        # key -> (lock, number of updates holding or waiting for it)
+        self._locks: Dict[Hashable, tuple[asyncio.Lock, int]] = {}
+
+    @staticmethod
+    def _key(update: object) -> Optional[Hashable]:
+        if not isinstance(update, Update):
+            return None
+        chat, user = update.effective_chat, update.effective_user
+        if chat is None and user is None:
+            return None
+        return (chat.id if chat else None, user.id if user else None)
+
+    async def process_update(self, update: object, coroutine: Awaitable) -> None:
+        # The chat's lock comes first: updates queued behind their own chat
+        # must not hold concurrency slots other chats could use
+        key = self._key(update)
+        if key is None:
+            await super().process_update(update, coroutine)
+            return
+
+        lock, users = self._locks.get(key, (None, 0))
+        if lock is None:
+            lock = asyncio.Lock()
+        self._locks[key] = (lock, users + 1)
+        try:
+            async with lock:
+                await super().process_update(update, coroutine)
+        finally:
+            lock, users = self._locks[key]
+            if users == 1:
+                del self._locks[key]
+            else:
+                self._locks[key] = (lock, users - 1)
+
+    async def do_process_update(self, update: object, coroutine: Awaitable) -> None:
+        await coroutine
+
+    async def initialize(self) -> None:
+        pass
+
+    async def shutdown(self) -> None:
+        pass
@@ -0,0 +1,122 @@
+import asyncio
+import logging
+from typing import Any, Awaitable, Callable, List, Optional, Tuple
+
+from sqlalchemy.ext.asyncio import AsyncConnection, AsyncEngine, AsyncSession
+
+logger = logging.getLogger(__name__)
+
+WriteOp = Callable[[AsyncSession], Awaitable[Any]]
+
+_STOP = object()
+
+
+class WriteQueue:
+    """
+    Single writer for SQLite.
+
+    Owns the only write connection. Write operations are queued and the ones
+    arriving within `batch_window` seconds are committed together in one
+    transaction (group commit): a burst of writes costs one fsync and never
+    runs into "database is locked".
+
+    If an operation raises, the batch is rolled back and replayed with one
+    transaction per operation, so only the faulty write fails. Operations
+    may therefore run more than once and must keep their side effects in
+    the database. They must return plain values (views, ids, flags), not
+    ORM objects - the batch session is closed afterwards.
+    """
+
+    def __init__(self, engine: AsyncEngine, batch_window: float = 0.005, max_batch: int = 100):
+        self.engine = engine
+        self.batch_window = batch_window
+        self.max_batch = max_batch
+        self._queue: asyncio.Queue = asyncio.Queue()
+        self._connection: Optional[AsyncConnection] = None
+        self._task: Optional[asyncio.Task] = None
+
+    @property
+    def running(self) -> bool:
+        return self._task is not None and not self._task.done()
+
+    async def start(self):
+        """Open the write connection and start the writer task"""
+        self._connection = await self.engine.connect()
+        self._task = asyncio.create_task(self._run(), name="db-writer")
+        logger.info("🖊 Database write queue started")
+
+    async def stop(self):
+        """Commit everything already queued, then stop the writer"""
+        if not self.running:
+            return
+        await self._queue.put(_STOP)
+        await self._task
+        await self._connection.close()
+        self._task = None
+        self._connection = None
+
+    async def submit(self, op: WriteOp) -> Any:
+        """Queue a write and wait until the batch containing it is committed"""
+        if not self.running:
+            raise RuntimeError("Write queue is not running")
+        future = asyncio.get_running_loop().create_future()
+        await self._queue.put((op, future))
+        return await future
+
+    async def _run(self):
+        stopping = False
+        while not stopping:
+            item = await self._queue.get()
+            if item is _STOP:
+                break
+            batch, stopping = await self._collect_batch(item)
+            await self._commit_batch(batch)
+
+    async def _collect_batch(self, first) -> Tuple[List, bool]:
+        """Gather the writes arriving within the batch window"""
+        batch = [first]
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + self.batch_window
+
+        while len(batch) < self.max_batch:
+            timeout = deadline - loop.time()
+            try:
+                if timeout > 0:
+                    item = await asyncio.wait_for(self._queue.get(), timeout)
+                else:
+                    item = self._queue.get_nowait()
+            except (asyncio.TimeoutError, asyncio.QueueEmpty):
+                break
+            if item is _STOP:
+                return batch, True
+            batch.append(item)
+        return batch, False
+
+    async def _commit_batch(self, batch: List):
+        batch = [(op, future) for op, future in batch if not future.cancelled()]
+        if not batch:
+            return
+
+        try:
+            results = await self._execute(batch)
+        except Exception as e:
+            if len(batch) == 1:
+                _, future = batch[0]
+                if not future.done():
+                    future.set_exception(e)
+                return
+            # One write failed and took the whole transaction with it:
+            # replay them one transaction each so only the faulty ones fail
+            for item in batch:
+                await self._commit_batch([item])
+            return
+
+        for (_, future), result in zip(batch, results):
+            if not future.done():
+                future.set_result(result)
+
+    async def _execute(self, batch: List) -> List:
+        """Run all operations of a batch in one transaction"""
+        async with AsyncSession(bind=self._connection, expire_on_commit=False) as db:
+            async with db.begin():
+                return [await op(db) for op, _ in batch]